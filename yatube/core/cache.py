@@ -0,0 +1,284 @@
+import hashlib
+import os
+import pickle
+import tempfile
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from typing import Callable
+from urllib.parse import quote
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+from django.core.cache.backends.filebased import FileBasedCache
+from django.core.files import locks
+
+REBUILD_LOCK_TIMEOUT: int = 30
+# счётчики версий читаются только из общего кеша: после сброса ленты
+# процессы не должны отдавать старую версию ещё LOCAL_TIMEOUT секунд
+SHARED_ONLY_SUFFIXES = (':version', ':changed', ':generation')
+# длиннее этого часть ключа заменяется хешем (memcached: ключ до 250)
+KEY_PART_MAX_LENGTH: int = 64
+# замок FileCache.incr; без суффикса .djcache его не трогают cull и clear
+INCR_LOCK_FILE: str = 'incr.lock'
+
+# локальные уровни общие для всех потоков процесса, как у LocMemCache
+_local_tiers = {}
+_local_tiers_lock = threading.Lock()
+
+
+class LocalLRU:
+    """LRU в памяти процесса с пределом по размеру и собственным TTL.
+
+    Значения хранятся сериализованными: размер считается честно,
+    а изменение полученного объекта не портит кеш.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            expires, payload = item
+            if expires is not None and expires <= time.monotonic():
+                self._pop(key)
+                return None
+            self._data.move_to_end(key)
+        return payload
+
+    def set(self, key, payload: bytes, timeout) -> None:
+        if len(payload) > self.max_bytes:
+            self.delete(key)
+            return
+        expires = None if timeout is None else time.monotonic() + timeout
+        with self._lock:
+            self._pop(key)
+            self._data[key] = (expires, payload)
+            self.size += len(payload)
+            while self.size > self.max_bytes:
+                self._pop(next(iter(self._data)))
+
+    def delete(self, key) -> None:
+        with self._lock:
+            self._pop(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self.size = 0
+
+    def _pop(self, key) -> None:
+        item = self._data.pop(key, None)
+        if item is not None:
+            self.size -= len(item[1])
+
+
+class TieredCache(BaseCache):
+    """Двухуровневый кеш: LRU процесса перед общим кешем.
+
+    OPTIONS:
+        SHARED — алиас общего кеша из CACHES (файловый, memcached);
+        LOCAL_MAX_BYTES — предел локального уровня;
+        LOCAL_TIMEOUT — сколько секунд процесс верит своей копии,
+        то есть насколько он может отстать от записей других процессов;
+        SHARED_ONLY_SUFFIXES — окончания ключей, которые мимо локального
+        уровня всегда читаются из общего кеша (счётчики версий).
+    """
+
+    def __init__(self, location, params):
+        super().__init__(params)
+        options = params.get('OPTIONS', {})
+        self._shared_alias = options.get('SHARED', 'shared')
+        self.local_timeout = options.get('LOCAL_TIMEOUT', 5)
+        self.shared_only = tuple(options.get('SHARED_ONLY_SUFFIXES',
+                                             SHARED_ONLY_SUFFIXES))
+        with _local_tiers_lock:
+            self._local = _local_tiers.setdefault(
+                location or self._shared_alias,
+                LocalLRU(options.get('LOCAL_MAX_BYTES', 32 * 1024 * 1024)),
+            )
+
+    @property
+    def shared(self) -> BaseCache:
+        return caches[self._shared_alias]
+
+    def _local_timeout(self, timeout):
+        timeout = self.get_backend_timeout(timeout)
+        if timeout is None:
+            return self.local_timeout
+        return min(timeout - time.time(), self.local_timeout)
+
+    def _is_local(self, key) -> bool:
+        return not key.endswith(self.shared_only)
+
+    def _remember(self, key, value, timeout, version) -> None:
+        if not self._is_local(key):
+            return
+        payload = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+        self._local.set(self.make_key(key, version), payload,
+                        self._local_timeout(timeout))
+
+    def get(self, key, default=None, version=None):
+        if self._is_local(key):
+            payload = self._local.get(self.make_key(key, version))
+            if payload is not None:
+                return pickle.loads(payload)
+        sentinel = object()
+        value = self.shared.get(key, sentinel, version=version)
+        if value is sentinel:
+            return default
+        self._remember(key, value, DEFAULT_TIMEOUT, version)
+        return value
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        self.shared.set(key, value, timeout, version=version)
+        self._remember(key, value, timeout, version)
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        # add должен видеть общий кеш: на нём держатся замки пересборки
+        added = self.shared.add(key, value, timeout, version=version)
+        if added:
+            self._remember(key, value, timeout, version)
+        return added
+
+    def delete(self, key, version=None):
+        self._local.delete(self.make_key(key, version))
+        self.shared.delete(key, version=version)
+
+    def incr(self, key, delta=1, version=None):
+        value = self.shared.incr(key, delta, version=version)
+        self._remember(key, value, None, version)
+        return value
+
+    def has_key(self, key, version=None):
+        if self._local.get(self.make_key(key, version)) is not None:
+            return True
+        return self.shared.has_key(key, version=version)
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        self._local.delete(self.make_key(key, version))
+        return self.shared.touch(key, timeout, version=version)
+
+    def clear(self):
+        self._local.clear()
+        self.shared.clear()
+
+
+class FileCache(FileBasedCache):
+    """FileBasedCache с атомарными add и incr между процессами.
+
+    Стандартный add проверяет и пишет двумя шагами; здесь файл
+    появляется через os.link, который не перезаписывает чужой файл.
+    incr читает и пишет под замком каталога и сохраняет срок жизни
+    ключа. Каталог общий только для воркеров одного сервера, а отсечение
+    лишних записей на каждом set перебирает весь каталог.
+    """
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        self._createdir()
+        fname = self._key_to_file(key, version)
+        if os.path.exists(fname) and not self.has_key(key, version):
+            self._delete(fname)
+        fd, tmp_path = tempfile.mkstemp(dir=self._dir)
+        try:
+            with open(fd, 'wb') as f:
+                self._write_content(f, timeout, value)
+            os.link(tmp_path, fname)
+            return True
+        except FileExistsError:
+            return False
+        finally:
+            os.remove(tmp_path)
+
+    def incr(self, key, delta=1, version=None):
+        # set заменяет файл переименованием, поэтому замок берётся
+        # на отдельный файл каталога, а не на файл ключа
+        self._createdir()
+        with open(os.path.join(self._dir, INCR_LOCK_FILE), 'ab') as lock:
+            locks.lock(lock, locks.LOCK_EX)
+            try:
+                expiry, value = self._read(key, version)
+                if expiry is not None and expiry < time.time():
+                    raise ValueError(f"Key '{key}' not found")
+                value += delta
+                timeout = None if expiry is None else expiry - time.time()
+                self.set(key, value, timeout, version=version)
+                return value
+            finally:
+                locks.unlock(lock)
+
+    def _read(self, key, version):
+        try:
+            with open(self._key_to_file(key, version), 'rb') as f:
+                expiry = pickle.load(f)
+                return expiry, pickle.loads(zlib.decompress(f.read()))
+        except FileNotFoundError:
+            raise ValueError(f"Key '{key}' not found")
+
+
+def isolated_caches(name: str = 'benchmark') -> dict:
+    """CACHES для замеров: те же алиасы, но в отдельной памяти процесса.
+
+    Команды замеров чистят кеш перед каждым прогоном; под
+    override_settings(CACHES=isolated_caches()) это не стирает боевые
+    страницы и сессии из общего кеша.
+    """
+    default = dict(settings.CACHES['default'], LOCATION=name)
+    return {
+        'default': default,
+        'shared': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': f'yatube-{name}',
+        },
+    }
+
+
+def key_part(value: str) -> str:
+    """Строка (slug, имя) для ключа кеша: ASCII без пробелов.
+
+    Кириллица и пробелы кодируются как в URL, чтобы memcached
+    не отверг ключ; слишком длинное значение заменяется хешем.
+    """
+    quoted = quote(value, safe='')
+    if len(quoted) <= KEY_PART_MAX_LENGTH:
+        return quoted
+    return hashlib.md5(value.encode()).hexdigest()
+
+
+def get_or_rebuild(cache: BaseCache, key: str, build: Callable,
+                   timeout: int, cacheable: Callable = None,
+                   wait_seconds: float = 2.0):
+    """Значение из кеша; при промахе его пересобирает только один воркер.
+
+    Остальные ждут до wait_seconds, пока значение появится,
+    и только потом собирают его сами.
+    """
+    value = cache.get(key)
+    if value is not None:
+        return value
+
+    lock_key = f'{key}:rebuild'
+    if cache.add(lock_key, 1, REBUILD_LOCK_TIMEOUT):
+        try:
+            value = build()
+            if cacheable is None or cacheable(value):
+                cache.set(key, value, timeout)
+            return value
+        finally:
+            cache.delete(lock_key)
+
+    deadline = time.monotonic() + wait_seconds
+    while time.monotonic() < deadline:
+        time.sleep(0.05)
+        value = cache.get(key)
+        if value is not None:
+            return value
+    return build()
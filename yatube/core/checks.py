@@ -0,0 +1,19 @@
+from django.conf import settings
+from django.core.checks import Warning
+
+
+def check_session_mode(app_configs, **kwargs):
+    """SESSION_ENGINE считается из SESSION_MODE один раз при загрузке
+    settings.py: профиль, поменявший только режим, хранилище не меняет.
+    """
+    engines = getattr(settings, 'SESSION_ENGINES', {})
+    mode = getattr(settings, 'SESSION_MODE', None)
+    if mode is None or engines.get(mode) == settings.SESSION_ENGINE:
+        return []
+    return [Warning(
+        f'SESSION_MODE = {mode!r}, но SESSION_ENGINE = '
+        f'{settings.SESSION_ENGINE!r}',
+        hint='После SESSION_MODE задайте и '
+             'SESSION_ENGINE = SESSION_ENGINES[SESSION_MODE].',
+        id='core.W001',
+    )]
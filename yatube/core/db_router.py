@@ -0,0 +1,43 @@
+import random
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import connections
+
+# True, когда запрос должен читать с основной базы: во время записи
+# и в течение PRIMARY_STICKY_SECONDS после неё (см. PrimaryStickyMiddleware)
+use_primary = ContextVar('use_primary', default=False)
+
+PRIMARY_DB: str = 'default'
+
+
+class PrimaryReplicaRouter:
+    """Чтения моделей posts и auth на реплики, запись на основную базу."""
+
+    route_app_labels = {'posts', 'auth'}
+
+    def __init__(self):
+        self.replicas = list(getattr(settings, 'DATABASE_REPLICAS', []))
+
+    def db_for_read(self, model, **hints):
+        # внутри транзакции читаем её же данные: реплика не видит
+        # незакоммиченных строк, и вне запроса use_primary не выставлен
+        if (not self.replicas
+                or use_primary.get()
+                or connections[PRIMARY_DB].in_atomic_block
+                or model._meta.app_label not in self.route_app_labels):
+            return PRIMARY_DB
+        return random.choice(self.replicas)
+
+    def db_for_write(self, model, **hints):
+        return PRIMARY_DB
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {PRIMARY_DB, *self.replicas}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # реплики получают схему и данные репликацией с основной базы
+        return db == PRIMARY_DB
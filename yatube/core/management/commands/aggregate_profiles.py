@@ -0,0 +1,50 @@
+import glob
+import os
+from collections import Counter, defaultdict
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core import profiler
+
+
+class Command(BaseCommand):
+    help = ('Сводит стеки всех воркеров в один файл folded на view '
+            '(вход для flamegraph.pl или speedscope) и печатает '
+            'функции, на которые пришлось больше всего выборок.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output', help='каталог для сводных файлов; '
+                            'по умолчанию PROFILER_DIR/merged')
+        parser.add_argument('--top', type=int, default=10)
+        parser.add_argument('--clear', action='store_true',
+                            help='удалить файлы воркеров после сводки')
+
+    def handle(self, *args, **options):
+        directory = profiler.profiles_dir()
+        paths = glob.glob(os.path.join(directory, '*.folded'))
+        if not paths:
+            raise CommandError(f'Нет файлов профиля в {directory}')
+
+        by_view = defaultdict(Counter)
+        for path in paths:
+            # имя файла: <view>.<pid>.folded
+            view_name = os.path.basename(path).rsplit('.', 2)[0]
+            profiler.read_folded(path, by_view[view_name])
+
+        output = options['output'] or os.path.join(directory, 'merged')
+        os.makedirs(output, exist_ok=True)
+        for view_name, counts in sorted(by_view.items()):
+            merged_path = os.path.join(output, f'{view_name}.folded')
+            with open(merged_path, 'w') as f:
+                for stack, count in counts.most_common():
+                    f.write(f'{stack} {count}\n')
+            self.stdout.write(
+                f'{view_name}: {sum(counts.values())} выборок -> '
+                f'{merged_path}')
+            for label, count in profiler.self_time(counts).most_common(
+                    options['top']):
+                self.stdout.write(f'  {count:>8}  {label}')
+
+        if options['clear']:
+            for path in paths:
+                os.remove(path)
@@ -0,0 +1,63 @@
+import statistics
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    help = ('Простой генератор нагрузки: несколько потоков в течение '
+            'заданного времени запрашивают адреса работающего сервера.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'urls', nargs='+',
+            help='полные адреса, например http://127.0.0.1:8000/'
+        )
+        parser.add_argument('--concurrency', type=int, default=8)
+        parser.add_argument('--duration', type=float, default=10.0)
+        parser.add_argument('--cookie', help='заголовок Cookie для запросов')
+
+    def handle(self, *args, **options):
+        deadline = time.monotonic() + options['duration']
+        headers = {'Cookie': options['cookie']} if options['cookie'] else {}
+        timings, errors = [], []
+        lock = threading.Lock()
+
+        def worker(number):
+            urls = options['urls']
+            index = number
+            while time.monotonic() < deadline:
+                request = urllib.request.Request(urls[index % len(urls)],
+                                                 headers=headers)
+                index += 1
+                started = time.perf_counter()
+                try:
+                    with urllib.request.urlopen(request) as response:
+                        response.read()
+                except (urllib.error.URLError, OSError) as error:
+                    with lock:
+                        errors.append(str(error))
+                    continue
+                with lock:
+                    timings.append(time.perf_counter() - started)
+
+        started = time.monotonic()
+        with ThreadPoolExecutor(max_workers=options['concurrency']) as pool:
+            list(pool.map(worker, range(options['concurrency'])))
+        elapsed = time.monotonic() - started
+
+        if not timings:
+            raise CommandError(
+                'Ни одного успешного ответа: ' + '; '.join(errors[:3]))
+        timings.sort()
+        p99 = timings[min(len(timings) - 1, int(len(timings) * 0.99))]
+        self.stdout.write(
+            f'Запросов: {len(timings)}, ошибок: {len(errors)}, '
+            f'{len(timings) / elapsed:.1f} запр/с, '
+            f'p50 {statistics.median(timings) * 1000:.1f} мс, '
+            f'p99 {p99 * 1000:.1f} мс'
+        )
@@ -0,0 +1,41 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core import profiler
+
+
+class Command(BaseCommand):
+    help = ('Включает или выключает профилирование запросов к выбранным '
+            'view во всех воркерах без перезапуска.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('views', nargs='*',
+                            help='имена URL, например posts:index')
+        parser.add_argument('--rate', type=float, default=0.1,
+                            help='доля профилируемых запросов')
+        parser.add_argument('--minutes', type=float, default=10.0)
+        parser.add_argument('--stop', action='store_true')
+
+    def handle(self, *args, **options):
+        if options['stop']:
+            profiler.disable()
+            self.stdout.write('Профилирование выключено')
+            return
+        if not options['views']:
+            config = profiler.get_config()
+            if config is None:
+                self.stdout.write('Профилирование выключено')
+            else:
+                left = (config['until'] - time.time()) / 60
+                self.stdout.write(
+                    f'Профилируются {", ".join(config["views"])}: '
+                    f'доля {config["rate"]}, осталось {left:.1f} мин')
+            return
+        if not 0 < options['rate'] <= 1:
+            raise CommandError('--rate должен быть в пределах (0, 1]')
+        profiler.enable(options['views'], options['rate'],
+                        int(options['minutes'] * 60))
+        self.stdout.write(
+            f'Профилирование включено на {options["minutes"]:g} мин, '
+            f'файлы пишутся в {profiler.profiles_dir()}')
@@ -0,0 +1,20 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.template_warmup import warm_templates
+
+
+class Command(BaseCommand):
+    help = ('Компилирует все шаблоны проекта и сообщает об ошибках; '
+            'удобно запускать в CI перед выкладкой.')
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        loaded, failed = warm_templates()
+        self.stdout.write(
+            f'Скомпилировано шаблонов: {loaded} '
+            f'за {time.monotonic() - started:.2f} с'
+        )
+        if failed:
+            raise CommandError('Ошибки в шаблонах: ' + ', '.join(failed))
@@ -0,0 +1,108 @@
+import os
+import threading
+import time
+from collections import defaultdict
+
+from django.template.backends.django import Template
+
+_local = threading.local()
+_lock = threading.Lock()
+
+# view_name -> сумма по замеренным запросам
+_totals = defaultdict(lambda: {
+    'requests': 0,
+    'sql_queries': 0,
+    'sql_seconds': 0.0,
+    'template_seconds': 0.0,
+    'total_seconds': 0.0,
+})
+
+
+class RequestRecorder:
+    """Счётчики одного запроса, который попал в выборку."""
+
+    def __init__(self):
+        self.sql_queries = 0
+        self.sql_seconds = 0.0
+        self.template_seconds = 0.0
+        self.template_depth = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        # execute_wrapper: засекает каждый запрос к базе
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.sql_queries += 1
+            self.sql_seconds += time.perf_counter() - started
+
+
+def current_recorder():
+    return getattr(_local, 'recorder', None)
+
+
+def start_recording() -> RequestRecorder:
+    _local.recorder = RequestRecorder()
+    return _local.recorder
+
+
+def stop_recording() -> None:
+    _local.recorder = None
+
+
+def record(view_name: str, recorder: RequestRecorder,
+           total_seconds: float) -> None:
+    with _lock:
+        totals = _totals[view_name]
+        totals['requests'] += 1
+        totals['sql_queries'] += recorder.sql_queries
+        totals['sql_seconds'] += recorder.sql_seconds
+        totals['template_seconds'] += recorder.template_seconds
+        totals['total_seconds'] += total_seconds
+
+
+def snapshot() -> dict:
+    with _lock:
+        return {name: dict(values) for name, values in _totals.items()}
+
+
+def reset() -> None:
+    with _lock:
+        _totals.clear()
+
+
+def prometheus_text() -> str:
+    pid = os.getpid()
+    lines = []
+    data = snapshot()
+    for metric in ('requests', 'sql_queries', 'sql_seconds',
+                   'template_seconds', 'total_seconds'):
+        name = f'yatube_request_{metric}_total'
+        lines.append(f'# TYPE {name} counter')
+        lines.extend(
+            f'{name}{{view="{view}",pid="{pid}"}} {values[metric]}'
+            for view, values in sorted(data.items())
+        )
+    return '\n'.join(lines) + '\n'
+
+
+_original_render = Template.render
+
+
+def _timed_render(self, context=None, request=None):
+    recorder = current_recorder()
+    if recorder is None:
+        return _original_render(self, context, request)
+    # вложенные render_to_string уже учтены во внешнем рендеринге
+    recorder.template_depth += 1
+    started = time.perf_counter()
+    try:
+        return _original_render(self, context, request)
+    finally:
+        recorder.template_depth -= 1
+        if not recorder.template_depth:
+            recorder.template_seconds += time.perf_counter() - started
+
+
+def install_template_timer() -> None:
+    Template.render = _timed_render
@@ -0,0 +1,124 @@
+import json
+import logging
+import random
+import threading
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+from django.urls import Resolver404, resolve
+
+from . import metrics, profiler
+from .db_router import use_primary
+
+logger = logging.getLogger('yatube.requests')
+
+
+class RequestMetricsMiddleware:
+    """Число и время SQL, время шаблонов и общее время запроса.
+
+    Замеряется только доля запросов REQUEST_METRICS_SAMPLE_RATE,
+    остальные проходят без обёрток.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.sample_rate = getattr(settings, 'REQUEST_METRICS_SAMPLE_RATE', 0)
+        self.log = getattr(settings, 'REQUEST_METRICS_LOG', False)
+        metrics.install_template_timer()
+
+    def __call__(self, request):
+        if not self.sample_rate or random.random() >= self.sample_rate:
+            return self.get_response(request)
+
+        recorder = metrics.start_recording()
+        started = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(
+                        connection.execute_wrapper(recorder)
+                    )
+                response = self.get_response(request)
+        finally:
+            metrics.stop_recording()
+        total_seconds = time.perf_counter() - started
+
+        match = request.resolver_match
+        view_name = match.view_name if match else 'unresolved'
+        metrics.record(view_name, recorder, total_seconds)
+        if self.log:
+            logger.info(json.dumps({
+                'view': view_name,
+                'method': request.method,
+                'status': response.status_code,
+                'sql_queries': recorder.sql_queries,
+                'sql_ms': round(recorder.sql_seconds * 1000, 3),
+                'template_ms': round(recorder.template_seconds * 1000, 3),
+                'total_ms': round(total_seconds * 1000, 3),
+            }))
+        return response
+
+
+class PrimaryStickyMiddleware:
+    """Читать свою запись: после изменения данных запросы этого
+    клиента какое-то время идут на основную базу, а не на реплики.
+    """
+
+    cookie_name = 'use_primary'
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.sticky_seconds = getattr(settings, 'PRIMARY_STICKY_SECONDS', 10)
+
+    def __call__(self, request):
+        is_write = request.method not in ('GET', 'HEAD', 'OPTIONS', 'TRACE')
+        token = use_primary.set(
+            is_write or self.cookie_name in request.COOKIES
+        )
+        try:
+            response = self.get_response(request)
+        finally:
+            use_primary.reset(token)
+        if is_write and response.status_code < 400:
+            response.set_cookie(self.cookie_name, '1',
+                                max_age=self.sticky_seconds,
+                                httponly=True, samesite='Lax')
+        return response
+
+
+class ProfilingMiddleware:
+    """Снимает стеки для выборки запросов к выбранным view.
+
+    Включается на лету командой profile_views; пока профилирование
+    выключено, запрос стоит одного чтения из кеша.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.interval = getattr(settings, 'PROFILER_INTERVAL', 0.005)
+
+    def __call__(self, request):
+        config = profiler.get_config()
+        view_name = config and self.selected_view(request, config)
+        if not view_name:
+            return self.get_response(request)
+
+        sampler = profiler.StackSampler(threading.get_ident(), self.interval)
+        sampler.start()
+        try:
+            return self.get_response(request)
+        finally:
+            sampler.stop()
+            profiler.save(view_name, sampler.counts)
+
+    @staticmethod
+    def selected_view(request, config: dict):
+        if random.random() >= config['rate']:
+            return None
+        try:
+            view_name = resolve(request.path_info).view_name
+        except Resolver404:
+            return None
+        return view_name if view_name in config['views'] else None
@@ -0,0 +1,118 @@
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Iterable, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+
+CONFIG_KEY: str = 'profiler:config'
+
+_write_lock = threading.Lock()
+
+
+def profiles_dir() -> str:
+    return getattr(settings, 'PROFILER_DIR',
+                   os.path.join(settings.BASE_DIR, 'profiles'))
+
+
+def enable(view_names: Iterable[str], rate: float, seconds: int) -> dict:
+    """Включает профилирование во всех воркерах через общий кеш."""
+    config = {
+        'views': sorted(set(view_names)),
+        'rate': rate,
+        'until': time.time() + seconds,
+    }
+    cache.set(CONFIG_KEY, config, seconds)
+    return config
+
+
+def disable() -> None:
+    cache.delete(CONFIG_KEY)
+
+
+def get_config() -> Optional[dict]:
+    config = cache.get(CONFIG_KEY)
+    if config is None or config['until'] <= time.time():
+        return None
+    return config
+
+
+class StackSampler:
+    """Снимает стек одного потока с заданным интервалом.
+
+    Счётчик стеков сразу годится для flame graph: строка
+    «корень;...;лист» и число попаданий.
+    """
+
+    def __init__(self, thread_id: int, interval: float):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.counts = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True,
+                                        name='stack-sampler')
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is not None:
+                self.counts[fold_stack(frame)] += 1
+
+
+def frame_label(frame) -> str:
+    module = frame.f_globals.get('__name__', '?')
+    return f'{module}.{frame.f_code.co_name}'.replace(';', ':')
+
+
+def fold_stack(frame) -> str:
+    labels = []
+    while frame is not None:
+        labels.append(frame_label(frame))
+        frame = frame.f_back
+    return ';'.join(reversed(labels))
+
+
+def profile_path(view_name: str, directory: Optional[str] = None) -> str:
+    name = view_name.replace(':', '.')
+    return os.path.join(directory or profiles_dir(),
+                        f'{name}.{os.getpid()}.folded')
+
+
+def save(view_name: str, counts: Counter) -> None:
+    """Дописывает стеки запроса в файл этого воркера для этой view."""
+    if not counts:
+        return
+    directory = profiles_dir()
+    os.makedirs(directory, exist_ok=True)
+    lines = ''.join(f'{stack} {count}\n' for stack, count in counts.items())
+    with _write_lock:
+        with open(profile_path(view_name, directory), 'a') as f:
+            f.write(lines)
+
+
+def read_folded(path: str, counts: Optional[Counter] = None) -> Counter:
+    counts = Counter() if counts is None else counts
+    with open(path) as f:
+        for line in f:
+            stack, _, count = line.rstrip('\n').rpartition(' ')
+            if stack and count.isdigit():
+                counts[stack] += int(count)
+    return counts
+
+
+def self_time(counts: Counter) -> Counter:
+    """Сколько выборок пришлось на каждую функцию в вершине стека."""
+    leaves = Counter()
+    for stack, count in counts.items():
+        leaves[stack.rpartition(';')[2]] += count
+    return leaves
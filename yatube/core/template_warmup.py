@@ -0,0 +1,43 @@
+import logging
+import os
+from typing import List, Tuple
+
+from django.template import TemplateSyntaxError, engines
+
+logger = logging.getLogger('yatube.templates')
+
+
+def template_names(engine) -> List[str]:
+    """Имена всех шаблонов, которые видят загрузчики движка."""
+    names = set()
+    for loader in engine.engine.template_loaders:
+        # cached.Loader хранит настоящие загрузчики в .loaders
+        for real_loader in getattr(loader, 'loaders', [loader]):
+            for directory in real_loader.get_dirs():
+                for root, _, files in os.walk(directory):
+                    for filename in files:
+                        if filename.endswith(('.html', '.txt', '.xml')):
+                            path = os.path.join(root, filename)
+                            names.add(os.path.relpath(path, directory))
+    return sorted(name.replace(os.sep, '/') for name in names)
+
+
+def warm_templates() -> Tuple[int, List[str]]:
+    """Компилирует все шаблоны, чтобы cached.Loader держал их в памяти.
+
+    Возвращает число загруженных шаблонов и имена тех,
+    которые не скомпилировались.
+    """
+    loaded, failed = 0, []
+    for engine in engines.all():
+        if not hasattr(engine, 'engine'):
+            continue
+        for name in template_names(engine):
+            try:
+                engine.get_template(name)
+            except TemplateSyntaxError as error:
+                logger.warning('Шаблон %s не скомпилирован: %s', name, error)
+                failed.append(name)
+            else:
+                loaded += 1
+    return loaded, failed
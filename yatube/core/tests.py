@@ -1,3 +1,299 @@
+import os
+import pickle
+import tempfile
+import threading
+import time
+from io import StringIO
+from unittest import mock
 
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache, caches
+from django.core.management import call_command
+from django.db import connection, connections
+from django.template import engines
+from django.test import SimpleTestCase, TestCase, Client, override_settings
+from django.urls import reverse
 
-# Create your tests here.
+from posts.models import Post
+from . import metrics, profiler
+from .cache import FileCache, LocalLRU, get_or_rebuild
+from .checks import check_session_mode
+from .db_router import PrimaryReplicaRouter, use_primary
+from .sqlite import apply_sqlite_pragmas
+from .template_warmup import warm_templates
+
+User = get_user_model()
+
+
+class RequestMetricsMiddlewareTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        metrics.reset()
+        self.guest_client = Client()
+
+    @override_settings(REQUEST_METRICS_SAMPLE_RATE=1)
+    def test_sampled_request_is_recorded(self):
+        User.objects.create_user(username='Nameless')
+        self.guest_client.get(
+            reverse('posts:profile', kwargs={'username': 'Nameless'}))
+        totals = metrics.snapshot()['posts:profile']
+        self.assertEqual(totals['requests'], 1)
+        self.assertGreater(totals['sql_queries'], 0)
+        self.assertGreater(totals['template_seconds'], 0)
+        self.assertGreaterEqual(totals['total_seconds'],
+                                totals['template_seconds'])
+
+    @override_settings(REQUEST_METRICS_SAMPLE_RATE=0)
+    def test_unsampled_request_is_skipped(self):
+        self.guest_client.get(reverse('posts:index'))
+        self.assertEqual(metrics.snapshot(), {})
+
+    @override_settings(REQUEST_METRICS_SAMPLE_RATE=1)
+    def test_metrics_endpoint(self):
+        self.guest_client.get(reverse('posts:index'))
+        response = self.guest_client.get(reverse('request_metrics'))
+        self.assertContains(
+            response, 'yatube_request_requests_total{view="posts:index"')
+
+
+CACHED_TEMPLATES = [{
+    **settings.TEMPLATES[0],
+    'OPTIONS': {
+        **settings.TEMPLATES[0]['OPTIONS'],
+        'loaders': [(
+            'django.template.loaders.cached.Loader', [
+                'django.template.loaders.filesystem.Loader',
+                'django.template.loaders.app_directories.Loader',
+            ]
+        )],
+    },
+}]
+
+
+@override_settings(TEMPLATES=CACHED_TEMPLATES)
+class TemplateWarmupTests(SimpleTestCase):
+    def test_all_templates_are_warmed(self):
+        loaded, failed = warm_templates()
+        self.assertEqual(failed, [])
+        cached_loader = engines['django'].engine.template_loaders[0]
+        warmed = cached_loader.get_template_cache
+        self.assertIn('posts/post-display.html', warmed)
+        self.assertIn('base.html', warmed)
+        self.assertGreaterEqual(len(warmed), loaded)
+
+
+@override_settings(DATABASE_REPLICAS=['replica'])
+class PrimaryReplicaRouterTests(SimpleTestCase):
+    def setUp(self):
+        self.router = PrimaryReplicaRouter()
+
+    def test_reads_go_to_replica_and_writes_to_primary(self):
+        self.assertEqual(self.router.db_for_read(Post), 'replica')
+        self.assertEqual(self.router.db_for_read(User), 'replica')
+        self.assertEqual(self.router.db_for_write(Post), 'default')
+
+    def test_pinned_reads_go_to_primary(self):
+        token = use_primary.set(True)
+        try:
+            self.assertEqual(self.router.db_for_read(Post), 'default')
+        finally:
+            use_primary.reset(token)
+
+    def test_reads_in_transaction_go_to_primary(self):
+        with mock.patch.object(connections['default'], 'in_atomic_block',
+                               True):
+            self.assertEqual(self.router.db_for_read(Post), 'default')
+            self.assertEqual(self.router.db_for_read(User), 'default')
+
+    def test_migrations_only_on_primary(self):
+        self.assertTrue(self.router.allow_migrate('default', 'posts'))
+        self.assertFalse(self.router.allow_migrate('replica', 'posts'))
+
+
+class PrimaryStickyMiddlewareTests(TestCase):
+    def setUp(self):
+        self.author = User.objects.create_user(username='Nameless')
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.author)
+
+    def test_write_sets_sticky_cookie(self):
+        response = self.authorized_client.get(reverse('posts:post_create'))
+        self.assertNotIn('use_primary', response.cookies)
+        response = self.authorized_client.post(
+            reverse('posts:post_create'), data={'text': 'Тестовый текст'})
+        self.assertEqual(response.cookies['use_primary']['max-age'],
+                         settings.PRIMARY_STICKY_SECONDS)
+
+
+class SqlitePragmasTests(TestCase):
+    def cache_size(self):
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA cache_size')
+            return cursor.fetchone()[0]
+
+    @override_settings(SQLITE_PRAGMAS={'cache_size': -4321})
+    def test_pragmas_are_applied_to_connection(self):
+        previous = self.cache_size()
+        try:
+            apply_sqlite_pragmas(sender=None, connection=connection)
+            self.assertEqual(self.cache_size(), -4321)
+        finally:
+            with connection.cursor() as cursor:
+                cursor.execute(f'PRAGMA cache_size = {previous}')
+
+
+class LocalLRUTests(SimpleTestCase):
+    def test_evicts_least_recently_used_by_size(self):
+        lru = LocalLRU(max_bytes=10)
+        lru.set('a', b'aaaa', None)
+        lru.set('b', b'bbbb', None)
+        lru.get('a')
+        lru.set('c', b'cccc', None)
+        self.assertEqual(lru.get('a'), b'aaaa')
+        self.assertIsNone(lru.get('b'))
+        self.assertEqual(lru.size, 8)
+
+    def test_entries_expire(self):
+        lru = LocalLRU(max_bytes=10)
+        lru.set('a', b'a', 0.01)
+        time.sleep(0.02)
+        self.assertIsNone(lru.get('a'))
+
+
+class TieredCacheTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_local_tier_serves_copy_of_shared_value(self):
+        cache.set('key', {'value': 1})
+        self.assertEqual(caches['shared'].get('key'), {'value': 1})
+        cached = cache.get('key')
+        cached['value'] = 2
+        self.assertEqual(cache.get('key'), {'value': 1})
+
+    def test_incr_and_delete_reach_both_tiers(self):
+        cache.set('counter', 1)
+        self.assertEqual(cache.incr('counter'), 2)
+        self.assertEqual(cache.get('counter'), 2)
+        cache.delete('counter')
+        self.assertIsNone(cache.get('counter'))
+        self.assertIsNone(caches['shared'].get('counter'))
+
+    def test_version_keys_skip_local_tier(self):
+        cache.set('feed_page:index::version', 1)
+        cache.set('page', 1)
+        # другой процесс поднял версию и записал страницу в общий кеш
+        caches['shared'].set('feed_page:index::version', 2)
+        caches['shared'].set('page', 2)
+        self.assertEqual(cache.get('feed_page:index::version'), 2)
+        self.assertEqual(cache.get('page'), 1)
+
+
+class FileCacheTests(SimpleTestCase):
+    def test_add_does_not_overwrite(self):
+        with tempfile.TemporaryDirectory() as directory:
+            file_cache = FileCache(directory, {})
+            self.assertTrue(file_cache.add('lock', 1, 30))
+            self.assertFalse(file_cache.add('lock', 2, 30))
+            self.assertEqual(file_cache.get('lock'), 1)
+            file_cache.set('expired', 1, -1)
+            self.assertTrue(file_cache.add('expired', 2, 30))
+
+    def test_incr_is_atomic(self):
+        with tempfile.TemporaryDirectory() as directory:
+            FileCache(directory, {}).set('version', 1, None)
+
+            def bump():
+                file_cache = FileCache(directory, {})
+                for _ in range(50):
+                    file_cache.incr('version')
+
+            threads = [threading.Thread(target=bump) for _ in range(4)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            file_cache = FileCache(directory, {})
+            self.assertEqual(file_cache.get('version'), 201)
+            # incr не меняет срок жизни: версия без срока остаётся без него
+            with open(file_cache._key_to_file('version'), 'rb') as f:
+                self.assertIsNone(pickle.load(f))
+            with self.assertRaises(ValueError):
+                file_cache.incr('missing')
+
+
+class GetOrRebuildTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_only_one_caller_rebuilds(self):
+        builds = []
+
+        def build():
+            builds.append(1)
+            time.sleep(0.2)
+            return 'page'
+
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(
+                get_or_rebuild(cache, 'hot', build, 60)))
+            for _ in range(5)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(results, ['page'] * 5)
+        self.assertEqual(len(builds), 1)
+
+
+class ProfilingMiddlewareTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        override = override_settings(PROFILER_DIR=self.directory.name,
+                                     PROFILER_INTERVAL=0.0001)
+        override.enable()
+        self.addCleanup(override.disable)
+
+    def test_only_selected_views_are_profiled(self):
+        profiler.enable(['posts:index'], rate=1, seconds=60)
+        self.guest_client.get(reverse('posts:index'))
+        self.guest_client.get(reverse('posts:search'))
+        files = os.listdir(self.directory.name)
+        self.assertEqual(files, [f'posts.index.{os.getpid()}.folded'])
+        counts = profiler.read_folded(
+            os.path.join(self.directory.name, files[0]))
+        self.assertTrue(any('posts.views.index' in stack
+                            for stack in counts))
+
+    def test_disabled_profiler_writes_nothing(self):
+        profiler.enable(['posts:index'], rate=1, seconds=60)
+        call_command('profile_views', stop=True, stdout=StringIO())
+        self.guest_client.get(reverse('posts:index'))
+        self.assertEqual(os.listdir(self.directory.name), [])
+
+    def test_aggregate_merges_worker_files(self):
+        for pid, count in ((1, 2), (2, 3)):
+            path = os.path.join(self.directory.name,
+                                f'posts.index.{pid}.folded')
+            with open(path, 'w') as f:
+                f.write(f'main;posts.views.index;render {count}\n')
+        out = StringIO()
+        call_command('aggregate_profiles', stdout=out)
+        merged = profiler.read_folded(
+            os.path.join(self.directory.name, 'merged', 'posts.index.folded'))
+        self.assertEqual(merged, {'main;posts.views.index;render': 5})
+        self.assertIn('5  render', out.getvalue())
+
+
+class SessionModeCheckTests(SimpleTestCase):
+    def test_mode_without_engine_is_reported(self):
+        self.assertEqual(check_session_mode(None), [])
+        with override_settings(SESSION_MODE='cache'):
+            errors = check_session_mode(None)
+        self.assertEqual([error.id for error in errors], ['core.W001'])
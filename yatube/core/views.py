@@ -1,3 +1,10 @@
+from django.http import HttpResponse
 
+from . import metrics
 
-# Create your views here.
+
+def request_metrics(request):
+    return HttpResponse(
+        metrics.prometheus_text(),
+        content_type='text/plain; version=0.0.4'
+    )
@@ -1,6 +1,9 @@
 from django.contrib import admin
 
 from .models import Post, Group
+from .search import search_posts
+
+ADMIN_SEARCH_LIMIT: int = 1000
 
 
 class PostAdmin(admin.ModelAdmin):
@@ -10,6 +13,12 @@ class PostAdmin(admin.ModelAdmin):
     list_editable = ('group',)
     empty_value_display = '-пусто-'
 
+    def get_search_results(self, request, queryset, search_term):
+        if not search_term:
+            return queryset, False
+        ids = search_posts(search_term).ids(ADMIN_SEARCH_LIMIT)
+        return queryset.filter(pk__in=ids), False
+
 
 admin.site.register(Post, PostAdmin)
 admin.site.register(Group)
@@ -0,0 +1,98 @@
+from functools import partial
+
+from django.http import Http404, JsonResponse
+from django.views.decorators.http import require_safe
+
+from .concurrency import run_concurrently
+from .conditional import cache_headers, feed_condition, post_condition
+from .models import Group, Post, User
+from .views import get_cursor_page, get_group_cursor_page
+
+# ровно те колонки, которые попадают в ответ
+POST_FIELDS = ('text', 'pub_date', 'author', 'author__username',
+               'group', 'group__slug')
+
+
+def api_posts():
+    return Post.objects.select_related('author', 'group').only(*POST_FIELDS)
+
+
+def serialize_post(post: Post) -> dict:
+    return {
+        'id': post.pk,
+        'text': post.text,
+        'pub_date': post.pub_date.isoformat(),
+        'author': post.author.username,
+        'group': post.group.slug if post.group else None,
+    }
+
+
+def page_payload(page_obj) -> dict:
+    return {
+        'results': [serialize_post(post) for post in page_obj],
+        'next': page_obj.next_cursor,
+        'previous': page_obj.previous_cursor,
+    }
+
+
+def get_values_or_404(queryset, *fields, **lookup) -> dict:
+    values = queryset.filter(**lookup).values(*fields).first()
+    if values is None:
+        raise Http404
+    return values
+
+
+@require_safe
+@cache_headers
+@feed_condition('json', 'index')
+def index_api(request):
+    page_obj = get_cursor_page(request.GET.get('cursor'), api_posts())
+    return JsonResponse(page_payload(page_obj))
+
+
+@require_safe
+@cache_headers
+@feed_condition('json', 'group_posts', 'slug', 'group__slug')
+def group_api(request, slug):
+    post_list = api_posts().filter(group__slug=slug)
+    group, page_obj = run_concurrently(
+        partial(get_values_or_404, Group.objects, 'slug', 'title',
+                'description', slug=slug),
+        partial(get_group_cursor_page, slug, request.GET.get('cursor'),
+                post_list),
+    )
+    return JsonResponse({'group': group, **page_payload(page_obj)})
+
+
+@require_safe
+@cache_headers
+@feed_condition('json', 'profile', 'username', 'author__username')
+def profile_api(request, username):
+    post_list = api_posts().filter(author__username=username)
+    author, page_obj = run_concurrently(
+        partial(get_values_or_404, User.objects, 'username',
+                'stats__posts_count', username=username),
+        partial(get_cursor_page, request.GET.get('cursor'), post_list),
+    )
+    author = {
+        'username': author['username'],
+        'posts_count': author['stats__posts_count'] or 0,
+    }
+    return JsonResponse({'author': author, **page_payload(page_obj)})
+
+
+@require_safe
+@cache_headers
+@post_condition('json')
+def post_detail_api(request, post_id):
+    post = get_values_or_404(
+        Post.objects, 'id', 'text', 'pub_date', 'author__username',
+        'group__slug', pk=post_id,
+    )
+    return JsonResponse({
+        'id': post['id'],
+        'text': post['text'],
+        'pub_date': post['pub_date'].isoformat(),
+        'author': post['author__username'],
+        'group': post['group__slug'],
+    })
@@ -0,0 +1,58 @@
+from collections import Counter
+from typing import Iterable, List
+
+from django.db import connection, transaction
+from django.db.models import Case, DateTimeField, Value, When
+
+from .models import Post
+from .signals import change_posts_count
+
+
+def inserted_ids(batch: List[Post]) -> List[int]:
+    """id только что вставленной пачки в порядке вставки.
+
+    Где bulk_create не возвращает id (SQLite), берутся последние
+    len(batch) id: с первой вставки транзакция держит блокировку
+    записи, и чужих строк между ними нет.
+    """
+    if connection.features.can_return_ids_from_bulk_insert:
+        return [post.pk for post in batch]
+    ids = Post.objects.order_by('-pk').values_list(
+        'pk', flat=True
+    )[:len(batch)]
+    return sorted(ids)
+
+
+def bulk_insert_posts(batch: List[Post]) -> None:
+    """Вставляет пачку одним bulk_create и правит счётчики авторов.
+
+    auto_now_add при вставке ставит pub_date текущим временем, поэтому
+    заданные даты записываются следом одним UPDATE. bulk_create
+    не шлёт сигналы, и AuthorStats обновляется здесь в той же
+    транзакции.
+    """
+    pub_dates = [post.pub_date for post in batch]
+    with transaction.atomic():
+        Post.objects.bulk_create(batch)
+        ids = inserted_ids(batch)
+        Post.objects.filter(pk__in=ids).update(pub_date=Case(
+            *(When(pk=pk, then=Value(pub_date, output_field=DateTimeField()))
+              for pk, pub_date in zip(ids, pub_dates)),
+            output_field=DateTimeField(),
+        ))
+        for post, pk, pub_date in zip(batch, ids, pub_dates):
+            post.pk, post.pub_date = pk, pub_date
+        counts = Counter(post.author_id for post in batch)
+        for author_id, delta in counts.items():
+            change_posts_count(author_id, delta)
+
+
+def batched(items: Iterable, size: int):
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
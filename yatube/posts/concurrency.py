@@ -0,0 +1,54 @@
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List
+
+from django.conf import settings
+from django.db import connections
+
+_executor = None
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=getattr(settings, 'FEED_QUERY_WORKERS', 8),
+            thread_name_prefix='feed-query',
+        )
+    return _executor
+
+
+def _close_broken_connections() -> None:
+    for connection in connections.all():
+        if connection.errors_occurred and not connection.is_usable():
+            connection.close()
+
+
+def _run_in_thread(call: Callable):
+    """Вызов в потоке пула на соединении этого потока.
+
+    Соединение живёт вместе с потоком: close_old_connections после
+    каждого вызова при CONN_MAX_AGE = 0 открывало бы новое на каждый
+    запрос. Закрывается только соединение, сломанное ошибкой.
+    """
+    try:
+        return call()
+    finally:
+        _close_broken_connections()
+
+
+def run_concurrently(*calls: Callable) -> List:
+    """Выполняет независимые запросы параллельно в пуле потоков.
+
+    Без FEED_CONCURRENT_QUERIES вызовы идут по очереди в текущем
+    потоке. Исключения (например, Http404) пробрасываются вызывающему.
+    """
+    if not getattr(settings, 'FEED_CONCURRENT_QUERIES', False):
+        return [call() for call in calls]
+    executor = _get_executor()
+    # контекст запроса (например, привязка к основной базе) переходит в поток
+    futures = [
+        executor.submit(contextvars.copy_context().run, _run_in_thread, call)
+        for call in calls
+    ]
+    return [future.result() for future in futures]
@@ -0,0 +1,129 @@
+import hashlib
+from calendar import timegm
+from functools import wraps
+from typing import Callable, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Max
+from django.utils.cache import (
+    get_conditional_response, patch_cache_control, patch_vary_headers
+)
+from django.utils.http import http_date, quote_etag
+
+from .models import Post
+from .page_cache import feed_changed_key, feed_version_key
+
+PAGE_MAX_AGE: int = getattr(settings, 'PAGE_MAX_AGE', 0)
+
+
+def make_etag(*parts) -> str:
+    raw = '|'.join(str(part) for part in parts)
+    return hashlib.md5(raw.encode()).hexdigest()
+
+
+def conditional(validators: Callable):
+    """Отвечает 304 до вызова view, если валидаторы клиента совпали.
+
+    validators(request, *args, **kwargs) возвращает пару
+    (etag, last_modified) и должен обходиться дешёвым запросом.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if request.method not in ('GET', 'HEAD'):
+                return view(request, *args, **kwargs)
+
+            etag, last_modified = validators(request, *args, **kwargs)
+            etag = quote_etag(etag) if etag else None
+            timestamp = (timegm(last_modified.utctimetuple())
+                         if last_modified else None)
+            response = get_conditional_response(
+                request, etag=etag, last_modified=timestamp
+            )
+            if response is not None:
+                return response
+
+            # view может строить ключ кеша из тех же валидаторов
+            request.conditional_etag = etag
+            request.conditional_last_modified = last_modified
+            response = view(request, *args, **kwargs)
+            if response.status_code == 200:
+                if etag and not response.has_header('ETag'):
+                    response['ETag'] = etag
+                if timestamp and not response.has_header('Last-Modified'):
+                    response['Last-Modified'] = http_date(timestamp)
+            return response
+        return wrapper
+    return decorator
+
+
+def cache_headers(view):
+    """Cache-Control для страниц с валидаторами.
+
+    Браузер и прокси держат страницу PAGE_MAX_AGE секунд, дальше
+    переспрашивают с ETag. Страницы авторизованных только private.
+    """
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        response = view(request, *args, **kwargs)
+        if request.user.is_authenticated:
+            patch_cache_control(response, private=True,
+                                max_age=PAGE_MAX_AGE, must_revalidate=True)
+        else:
+            patch_cache_control(response, public=True,
+                                max_age=PAGE_MAX_AGE, must_revalidate=True)
+        patch_vary_headers(response, ('Cookie',))
+        return response
+    return wrapper
+
+
+def last_modified(**filters) -> Optional[object]:
+    """MAX(modified) ленты: modified не меньше pub_date, хватает одного."""
+    return Post.objects.filter(**filters).aggregate(
+        last_modified=Max('modified')
+    )['last_modified']
+
+
+def user_part(request, per_user: bool):
+    return request.user.pk if per_user else ''
+
+
+def feed_condition(variant: str, view_name: str,
+                   arg_name: Optional[str] = None,
+                   lookup: Optional[str] = None,
+                   per_user: bool = False):
+    """Валидаторы ленты: последнее изменение её постов и версия ленты.
+
+    Удаление поста MAX(modified) не видит, поэтому в ETag входит
+    версия ленты, а Last-Modified не раньше времени её сброса.
+    per_user нужен HTML: шапка страницы зависит от входа.
+    """
+    def validators(request, *args, **kwargs):
+        arg = str(kwargs.get(arg_name, '')) if arg_name else ''
+        filters = {lookup: arg} if lookup else {}
+        version_key = feed_version_key(view_name, arg)
+        changed_key = feed_changed_key(view_name, arg)
+        state = cache.get_many([version_key, changed_key])
+        version = state.get(version_key, 1)
+        modified = max(filter(None, (last_modified(**filters),
+                                     state.get(changed_key))), default=None)
+        etag = make_etag(variant, view_name, arg, version, modified,
+                         request.GET.urlencode(), user_part(request, per_user))
+        return etag, modified
+    return conditional(validators)
+
+
+def post_condition(variant: str, per_user: bool = False):
+    """Валидаторы поста: время изменения и счётчик постов автора."""
+    def validators(request, post_id, *args, **kwargs):
+        row = Post.objects.filter(pk=post_id).values_list(
+            'modified', 'author__stats__posts_count'
+        ).first()
+        if row is None:
+            return None, None
+        modified, posts_count = row
+        etag = make_etag(variant, post_id, modified, posts_count,
+                         user_part(request, per_user))
+        return etag, modified
+    return conditional(validators)
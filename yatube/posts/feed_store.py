@@ -0,0 +1,126 @@
+from typing import Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import QuerySet
+
+from core.cache import key_part
+
+from .models import Post
+from .paginators import NEXT, CursorPage, CursorPaginator, decode_cursor
+
+GROUP_FEED_STORE: bool = getattr(settings, 'GROUP_FEED_STORE', False)
+GROUP_FEED_SIZE: int = getattr(settings, 'GROUP_FEED_SIZE', 100)
+LOCK_TIMEOUT: int = 10
+# страховка от изменений мимо сигналов (QuerySet.update и т. п.)
+FEED_TIMEOUT: int = 24 * 60 * 60
+
+
+def feed_key(slug: str) -> str:
+    return f'group_feed:{key_part(slug)}'
+
+
+def rebuild_feed(slug: str) -> dict:
+    """Свежие (pub_date, id) группы от новых к старым.
+
+    complete — в списке вся лента группы, а не только её начало.
+    """
+    rows = list(
+        Post.objects.filter(group__slug=slug)
+        .order_by('-pub_date', '-pk')
+        .values_list('pub_date', 'pk')[:GROUP_FEED_SIZE + 1]
+    )
+    feed = {
+        'complete': len(rows) <= GROUP_FEED_SIZE,
+        'entries': rows[:GROUP_FEED_SIZE],
+    }
+    cache.set(feed_key(slug), feed, FEED_TIMEOUT)
+    return feed
+
+
+def load_feed(slug: str) -> dict:
+    feed = cache.get(feed_key(slug))
+    if feed is None:
+        feed = rebuild_feed(slug)
+    return feed
+
+
+def drop_feed(slug: str) -> None:
+    cache.delete(feed_key(slug))
+
+
+def _update(slug: str, change) -> None:
+    key = feed_key(slug)
+    lock_key = f'{key}:lock'
+    if not cache.add(lock_key, 1, LOCK_TIMEOUT):
+        # список меняет другой воркер: проще пересобрать при чтении,
+        # чем потерять запись
+        drop_feed(slug)
+        return
+    try:
+        feed = cache.get(key)
+        if feed is not None:
+            change(feed)
+            cache.set(key, feed, FEED_TIMEOUT)
+    finally:
+        cache.delete(lock_key)
+
+
+def add_post(slug: str, post: Post) -> None:
+    def change(feed):
+        entries = [entry for entry in feed['entries'] if entry[1] != post.pk]
+        entries.append((post.pub_date, post.pk))
+        entries.sort(reverse=True)
+        if len(entries) > GROUP_FEED_SIZE:
+            feed['complete'] = False
+        feed['entries'] = entries[:GROUP_FEED_SIZE]
+    _update(slug, change)
+
+
+def remove_post(slug: str, post_id: int) -> None:
+    # без поста список остаётся верным началом ленты, только короче
+    def change(feed):
+        feed['entries'] = [
+            entry for entry in feed['entries'] if entry[1] != post_id
+        ]
+    _update(slug, change)
+
+
+def get_group_page(slug: str, cursor: Optional[str], post_list: QuerySet,
+                   per_page: int) -> Optional[CursorPage]:
+    """Страница ленты группы по списку id: один запрос in_bulk.
+
+    Возвращает None, если страница выходит за пределы списка
+    и её нужно читать из базы обычным keyset-запросом.
+    """
+    feed = load_feed(slug)
+    entries, complete = feed['entries'], feed['complete']
+    decoded = decode_cursor(cursor)
+
+    if decoded is None or decoded[0] == NEXT:
+        start = 0
+        if decoded is not None:
+            key = (decoded[1], decoded[2])
+            start = next((i for i, entry in enumerate(entries)
+                          if entry < key), len(entries))
+        window = entries[start:start + per_page + 1]
+        if len(window) <= per_page and not complete:
+            return None
+        has_next = len(window) > per_page
+        has_previous = decoded is not None and bool(window)
+        window = window[:per_page]
+    else:
+        key = (decoded[1], decoded[2])
+        end = next((i for i, entry in enumerate(entries) if entry <= key),
+                   len(entries))
+        if end == len(entries) and not complete:
+            return None
+        window = entries[max(0, end - per_page):end]
+        has_next = bool(window)
+        has_previous = end > per_page
+
+    ids = [pk for _, pk in window]
+    posts = post_list.in_bulk(ids)
+    paginator = CursorPaginator(post_list, per_page)
+    return CursorPage([posts[pk] for pk in ids if pk in posts], paginator,
+                      has_next=has_next, has_previous=has_previous)
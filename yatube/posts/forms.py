@@ -1,9 +1,39 @@
 from django import forms
+from django.urls import reverse_lazy
 
-from .models import Post
+from .group_choices import group_autocomplete_enabled, group_choices
+from .models import Group, Post
 
 
 class PostForm(forms.ModelForm):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # список групп из кеша; queryset поля нужен только для проверки
+        group = self.fields['group']
+        self.group_autocomplete = group_autocomplete_enabled()
+        if self.group_autocomplete:
+            # в select только выбранная группа, остальные подгружает
+            # скрипт автодополнения
+            group.widget.attrs['data-autocomplete-url'] = reverse_lazy(
+                'posts:group_autocomplete'
+            )
+            group.choices = lambda: [('', group.empty_label),
+                                     *self.selected_group_choice()]
+        else:
+            group.choices = lambda: [('', group.empty_label),
+                                     *group_choices()]
+
+    def selected_group_choice(self):
+        value = self['group'].value()
+        if not value:
+            return []
+        try:
+            return list(Group.objects.filter(pk=value).values_list(
+                'pk', 'title'
+            ))
+        except (TypeError, ValueError):
+            return []
+
     class Meta:
         model = Post
         fields = ('text', 'group')
@@ -0,0 +1,69 @@
+import os
+import threading
+from collections import Counter
+
+from django.core.cache import cache
+from django.template.loader import render_to_string
+from django.utils.translation import get_language
+
+from core.cache import key_part
+
+CARD_TEMPLATE: str = 'posts/post-display.html'
+CARD_TIMEOUT: int = 60 * 60
+
+_stats = Counter()
+_stats_lock = threading.Lock()
+
+
+def card_version_key(post_id: int) -> str:
+    return f'post_card:{post_id}:version'
+
+
+def card_key(post, version: int) -> str:
+    # строка автора в карточке: переименование даёт новый ключ
+    author = key_part(f'{post.author.username}:{post.author.get_full_name()}')
+    return f'post_card:{post.pk}:v{version}:{author}:{get_language()}'
+
+
+def bump_card_version(post_id: int) -> None:
+    """Новая версия делает все старые фрагменты поста недостижимыми."""
+    key = card_version_key(post_id)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, 2, None)
+
+
+def render_post_card(post) -> str:
+    version = cache.get(card_version_key(post.pk), 1)
+    key = card_key(post, version)
+    html = cache.get(key)
+    if html is not None:
+        _count('hits')
+        return html
+    _count('misses')
+    html = render_to_string(CARD_TEMPLATE, {'post': post})
+    cache.set(key, html, CARD_TIMEOUT)
+    return html
+
+
+def _count(name: str) -> None:
+    with _stats_lock:
+        _stats[name] += 1
+
+
+def card_cache_stats() -> dict:
+    with _stats_lock:
+        return {'hits': _stats['hits'], 'misses': _stats['misses']}
+
+
+def card_cache_metrics() -> str:
+    """Счётчики этого процесса в текстовом формате Prometheus."""
+    stats = card_cache_stats()
+    pid = os.getpid()
+    lines = ['# TYPE yatube_post_card_cache_total counter']
+    lines.extend(
+        f'yatube_post_card_cache_total{{result="{name}",pid="{pid}"}} {value}'
+        for name, value in stats.items()
+    )
+    return '\n'.join(lines) + '\n'
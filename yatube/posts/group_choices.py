@@ -0,0 +1,53 @@
+from typing import List, Tuple
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Q
+
+from core.cache import get_or_rebuild
+
+from .models import Group
+
+GROUP_CHOICES_KEY: str = 'post_form:group_choices'
+GROUP_CHOICES_TIMEOUT: int = 60 * 60
+GROUP_AUTOCOMPLETE_LIMIT: int = 20
+# последний символ Unicode: title < prefix + MAX_CHAR — это все
+# строки с этим префиксом, и такой диапазон читается из индекса
+MAX_CHAR: str = '\U0010ffff'
+
+
+def group_autocomplete_enabled() -> bool:
+    return getattr(settings, 'POST_FORM_GROUP_AUTOCOMPLETE', False)
+
+
+def group_choices() -> List[Tuple[int, str]]:
+    """Пары (id, название) для выбора группы, одна копия на все формы."""
+    return get_or_rebuild(
+        cache, GROUP_CHOICES_KEY,
+        lambda: list(Group.objects.order_by('title').values_list(
+            'pk', 'title'
+        )),
+        GROUP_CHOICES_TIMEOUT,
+    )
+
+
+def invalidate_group_choices() -> None:
+    cache.delete(GROUP_CHOICES_KEY)
+
+
+def find_groups(query: str,
+                limit: int = GROUP_AUTOCOMPLETE_LIMIT) -> List[dict]:
+    """Группы, чьё название начинается с query, по индексу на title.
+
+    Диапазон по индексу регистрозависим, поэтому проверяются два
+    варианта префикса: как ввели и с заглавной первой буквой.
+    """
+    query = query.strip()
+    if not query:
+        return []
+    prefixes = Q()
+    for prefix in {query, query[:1].upper() + query[1:]}:
+        prefixes |= Q(title__gte=prefix, title__lt=prefix + MAX_CHAR)
+    return list(Group.objects.filter(prefixes).order_by('title').values(
+        'pk', 'title', 'slug'
+    )[:limit])
@@ -0,0 +1,124 @@
+import random
+import statistics
+import threading
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError, connection
+
+from posts.models import Post
+from posts.views import get_cursor_page
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = ('Читает ленты из нескольких потоков, пока отдельный поток '
+            'создаёт посты; сравнивает профили настроек базы '
+            '(например, --settings=yatube.settings_production).')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--readers', type=int, default=8)
+        parser.add_argument('--duration', type=float, default=10.0)
+        parser.add_argument(
+            '--write-interval', type=float, default=0.0,
+            help='пауза между созданием постов, секунды'
+        )
+
+    def handle(self, *args, **options):
+        self.author_ids = self.load_authors()
+        self.write_interval = options['write_interval']
+        self.deadline = time.monotonic() + options['duration']
+        self.lock = threading.Lock()
+        self.timings = {'read': [], 'write': []}
+        self.errors = {'read': 0, 'write': 0}
+
+        threads = [threading.Thread(target=self.reader)
+                   for _ in range(options['readers'])]
+        threads.append(threading.Thread(target=self.writer))
+        started = time.monotonic()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.monotonic() - started
+
+        self.report('чтение', self.timings['read'], self.errors['read'],
+                    elapsed)
+        self.report('запись', self.timings['write'], self.errors['write'],
+                    elapsed)
+
+    def load_authors(self):
+        author_ids = list(User.objects.filter(
+            posts__isnull=False).values_list('pk', flat=True).distinct()[:100])
+        if not author_ids:
+            raise CommandError('Нет постов: запустите seed_posts')
+        self.stdout.write(
+            f'journal_mode: {self.pragma("journal_mode")}, '
+            f'synchronous: {self.pragma("synchronous")}'
+            if connection.vendor == 'sqlite' else f'база: {connection.vendor}'
+        )
+        connection.close()
+        return author_ids
+
+    def measure(self, kind, operation) -> bool:
+        """Выполняет операцию и записывает время или ошибку блокировки."""
+        started = time.perf_counter()
+        try:
+            operation()
+        except OperationalError:
+            with self.lock:
+                self.errors[kind] += 1
+            return False
+        with self.lock:
+            self.timings[kind].append(time.perf_counter() - started)
+        return True
+
+    def reader(self):
+        rnd = random.Random()
+        try:
+            while time.monotonic() < self.deadline:
+                if rnd.random() < 0.5:
+                    post_list = Post.objects.select_related('author', 'group')
+                else:
+                    post_list = Post.objects.filter(
+                        author_id=rnd.choice(self.author_ids)
+                    ).select_related('group')
+                self.measure(
+                    'read', lambda: list(get_cursor_page(None, post_list))
+                )
+        finally:
+            connection.close()
+
+    def writer(self):
+        rnd = random.Random()
+        try:
+            while time.monotonic() < self.deadline:
+                written = self.measure('write', lambda: Post.objects.create(
+                    text='Пост из benchmark_read_write',
+                    author_id=rnd.choice(self.author_ids),
+                ))
+                if written:
+                    time.sleep(self.write_interval)
+        finally:
+            connection.close()
+
+    def report(self, label, timings, errors, elapsed):
+        if not timings:
+            self.stdout.write(f'{label}: нет успешных операций, '
+                              f'ошибок {errors}')
+            return
+        timings.sort()
+        p99 = timings[min(len(timings) - 1, int(len(timings) * 0.99))]
+        self.stdout.write(
+            f'{label}: {len(timings) / elapsed:.1f} оп/с, '
+            f'p50 {statistics.median(timings) * 1000:.2f} мс, '
+            f'p99 {p99 * 1000:.2f} мс, ошибок {errors}'
+        )
+
+    @staticmethod
+    def pragma(name):
+        with connection.cursor() as cursor:
+            cursor.execute(f'PRAGMA {name}')
+            return cursor.fetchone()[0]
@@ -0,0 +1,133 @@
+import json
+import os
+import statistics
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import reverse
+
+from core.cache import isolated_caches
+from posts import urls as posts_urls
+from posts.models import Post
+
+User = get_user_model()
+
+
+def percentile(values, share):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, round(share * (len(ordered) - 1)))
+    return ordered[index]
+
+
+class Command(BaseCommand):
+    help = ('Замеряет p50/p99 времени ответа и число SQL-запросов для '
+            'каждого адреса posts.urls и сравнивает с сохранённой базой.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=50)
+        parser.add_argument('--baseline', default='benchmark_baseline.json')
+        parser.add_argument('--update-baseline', action='store_true')
+        parser.add_argument(
+            '--threshold', type=float, default=1.25,
+            help='во сколько раз p99 может вырасти без ошибки'
+        )
+        parser.add_argument(
+            '--anonymous', action='store_true',
+            help='ходить без авторизации, через кеш страниц'
+        )
+
+    def handle(self, *args, **options):
+        post = Post.objects.select_related('author', 'group').filter(
+            group__isnull=False).first()
+        if post is None:
+            raise CommandError('Нет постов с группой: запустите seed_posts')
+
+        results = {}
+        allowed_hosts = [*settings.ALLOWED_HOSTS, 'testserver']
+        # кеш замера отдельный: measure чистит его перед каждым адресом
+        with override_settings(ALLOWED_HOSTS=allowed_hosts,
+                               CACHES=isolated_caches()):
+            client = Client()
+            if not options['anonymous']:
+                client.force_login(post.author)
+            for name, url in self.urls(post):
+                results[name] = self.measure(client, url,
+                                             options['requests'])
+                self.stdout.write(
+                    f'{name:<24} p50 {results[name]["p50_ms"]:8.2f} мс  '
+                    f'p99 {results[name]["p99_ms"]:8.2f} мс  '
+                    f'запросов {results[name]["queries"]}'
+                )
+
+        path = options['baseline']
+        if options['update_baseline'] or not os.path.exists(path):
+            with open(path, 'w', encoding='utf-8') as stream:
+                json.dump(results, stream, indent=2, sort_keys=True)
+            self.stdout.write(f'База сохранена в {path}')
+            return
+
+        with open(path, encoding='utf-8') as stream:
+            baseline = json.load(stream)
+        regressions = list(
+            self.regressions(results, baseline, options['threshold'])
+        )
+        if regressions:
+            raise CommandError('Регрессии:\n' + '\n'.join(regressions))
+        self.stdout.write(self.style.SUCCESS('Регрессий нет'))
+
+    @staticmethod
+    def urls(post):
+        kwargs = {
+            'slug': post.group.slug,
+            'username': post.author.username,
+            'post_id': post.pk,
+            'section': 'posts',
+            'shard': 0,
+        }
+        for pattern in posts_urls.urlpatterns:
+            url = reverse(
+                f'{posts_urls.app_name}:{pattern.name}',
+                kwargs={key: kwargs[key] for key in pattern.pattern.converters}
+            )
+            if pattern.name in ('search', 'search_api'):
+                url += '?q=' + post.text.split()[0]
+            yield pattern.name, url
+
+    @staticmethod
+    def measure(client, url, requests):
+        timings = []
+        queries = 0
+        cache.clear()
+        for _ in range(requests):
+            with CaptureQueriesContext(connection) as captured:
+                started = time.perf_counter()
+                response = client.get(url)
+                timings.append((time.perf_counter() - started) * 1000)
+            if response.status_code >= 400:
+                raise CommandError(f'{url} ответил {response.status_code}')
+            queries = max(queries, len(captured))
+        return {
+            'url': url,
+            'p50_ms': round(statistics.median(timings), 3),
+            'p99_ms': round(percentile(timings, 0.99), 3),
+            'queries': queries,
+        }
+
+    @staticmethod
+    def regressions(results, baseline, threshold):
+        for name, result in results.items():
+            base = baseline.get(name)
+            if base is None:
+                continue
+            if result['queries'] > base['queries']:
+                yield (f'{name}: запросов {result["queries"]}, '
+                       f'было {base["queries"]}')
+            if result['p99_ms'] > base['p99_ms'] * threshold:
+                yield (f'{name}: p99 {result["p99_ms"]} мс, '
+                       f'было {base["p99_ms"]} мс')
@@ -0,0 +1,94 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from posts.models import Group, Post
+from posts.paginators import CursorPaginator, NEXT, PREVIOUS, encode_cursor
+from posts.views import MAX_POST_DISPLAYED
+
+User = get_user_model()
+
+# признаки плана, при которых лента читается без подходящего индекса
+BAD_PLAN_MARKERS = {
+    'sqlite': ('USE TEMP B-TREE',),
+    'postgresql': ('Seq Scan on posts_post', 'Sort'),
+    'mysql': ('Using filesort', 'type: ALL'),
+}
+
+FIRST_PAGE = 'first page'
+
+
+class Command(BaseCommand):
+    help = ('Выполняет EXPLAIN для запросов лент index, group_posts '
+            'и profile и проверяет, что они идут по индексам.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--group', help='slug группы для group_posts')
+        parser.add_argument('--username', help='автор для profile')
+
+    def handle(self, *args, **options):
+        group = self.get_sample(Group, 'slug', options['group'])
+        author = self.get_sample(User, 'username', options['username'])
+
+        # querysets строятся так же, как во views лент
+        feeds = {
+            'index': Post.objects.select_related('author', 'group'),
+            'group_posts': Post.objects.filter(
+                group__slug=group.slug
+            ).select_related('author'),
+            'profile': Post.objects.filter(
+                author__username=author.username
+            ).select_related('author', 'group'),
+        }
+        problems = []
+        for name, post_list in feeds.items():
+            for label, queryset in self.page_queries(post_list):
+                plan = queryset.explain()
+                self.stdout.write(f'--- {name} ({label})')
+                self.stdout.write(plan)
+                problems.extend(
+                    f'{name} ({label}): {line.strip()}'
+                    for line in plan.splitlines()
+                    if self.is_bad_line(line, cursor=label != FIRST_PAGE)
+                )
+
+        if problems:
+            raise CommandError(
+                'Запросы лент читают таблицу без индекса:\n'
+                + '\n'.join(problems)
+            )
+        self.stdout.write(
+            self.style.SUCCESS('Все запросы лент идут по индексам')
+        )
+
+    @staticmethod
+    def get_sample(model, field, value):
+        queryset = model.objects.all()
+        if value is not None:
+            queryset = queryset.filter(**{field: value})
+        sample = queryset.first()
+        if sample is None:
+            raise CommandError(f'Нет данных {model.__name__} для EXPLAIN')
+        return sample
+
+    @staticmethod
+    def page_queries(post_list):
+        paginator = CursorPaginator(post_list, MAX_POST_DISPLAYED)
+        yield FIRST_PAGE, paginator.page_queryset(None)
+        newest = paginator.object_list.first()
+        if newest is not None:
+            cursor = encode_cursor(NEXT, newest)
+            yield 'next cursor', paginator.page_queryset(cursor)
+            cursor = encode_cursor(PREVIOUS, newest)
+            yield 'previous cursor', paginator.page_queryset(cursor)
+
+    @staticmethod
+    def is_bad_line(line, cursor):
+        markers = BAD_PLAN_MARKERS.get(connection.vendor, ())
+        if any(marker in line for marker in markers):
+            return True
+        if cursor:
+            # страница по курсору должна искать границу в индексе:
+            # SCAN даже по индексу обходит его от самой свежей записи
+            return 'SCAN posts_post' in line
+        return 'SCAN posts_post' in line and 'USING' not in line
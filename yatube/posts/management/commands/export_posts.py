@@ -0,0 +1,54 @@
+import csv
+import json
+import time
+
+from django.core.management.base import BaseCommand
+
+from posts.models import Post
+
+FIELDS = ('text', 'author', 'group', 'pub_date')
+
+
+class Command(BaseCommand):
+    help = ('Выгружает посты в NDJSON или CSV, читая таблицу '
+            'потоком без загрузки всех строк в память.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='файл или - для stdout')
+        parser.add_argument('--format', choices=('ndjson', 'csv'))
+        parser.add_argument('--chunk-size', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        path = options['path']
+        file_format = options['format'] or (
+            'csv' if path.endswith('.csv') else 'ndjson'
+        )
+        rows = Post.objects.order_by('pk').values_list(
+            'text', 'author__username', 'group__slug', 'pub_date'
+        ).iterator(chunk_size=options['chunk_size'])
+
+        stream = (self.stdout if path == '-'
+                  else open(path, 'w', encoding='utf-8', newline=''))
+        started = time.monotonic()
+        exported = 0
+        try:
+            if file_format == 'csv':
+                writer = csv.writer(stream)
+                writer.writerow(FIELDS)
+            for text, author, group, pub_date in rows:
+                values = (text, author, group or '', pub_date.isoformat())
+                if file_format == 'csv':
+                    writer.writerow(values)
+                else:
+                    stream.write(json.dumps(dict(zip(FIELDS, values)),
+                                            ensure_ascii=False) + '\n')
+                exported += 1
+        finally:
+            if path != '-':
+                stream.close()
+
+        elapsed = max(time.monotonic() - started, 1e-6)
+        self.stderr.write(
+            f'Выгружено постов: {exported} '
+            f'за {elapsed:.1f} с ({exported / elapsed:.0f} постов/с)'
+        )
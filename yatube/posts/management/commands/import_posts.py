@@ -0,0 +1,157 @@
+import csv
+import json
+import sys
+import time
+from datetime import datetime
+from typing import Optional
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Max
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from posts import feed_store
+from posts.bulk import batched, bulk_insert_posts
+from posts.models import Group, Post
+from posts.page_cache import invalidate_feed
+from posts.search import get_backend
+
+User = get_user_model()
+
+
+def read_rows(stream, file_format):
+    """Пары (номер строки, запись); битая строка NDJSON даёт None."""
+    if file_format == 'csv':
+        reader = csv.DictReader(stream)
+        for row in reader:
+            yield reader.line_num, row
+        return
+    for number, line in enumerate(stream, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError:
+            row = None
+        yield number, row if isinstance(row, dict) else None
+
+
+def parse_pub_date(value) -> Optional[datetime]:
+    """Дата из ISO-строки, без пояса — UTC; для мусора None."""
+    if not value or not isinstance(value, str):
+        return None
+    try:
+        pub_date = parse_datetime(value)
+    except ValueError:
+        return None
+    if pub_date is not None and timezone.is_naive(pub_date):
+        pub_date = timezone.make_aware(pub_date, timezone.utc)
+    return pub_date
+
+
+class Command(BaseCommand):
+    help = ('Загружает посты из NDJSON или CSV (поля text, author, '
+            'group, pub_date) пачками через bulk_create.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='файл или - для stdin')
+        parser.add_argument('--format', choices=('ndjson', 'csv'))
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        path = options['path']
+        file_format = options['format'] or (
+            'csv' if path.endswith('.csv') else 'ndjson'
+        )
+        batch_size = options['batch_size']
+        if batch_size < 1:
+            raise CommandError('--batch-size должен быть больше нуля')
+
+        # справочники авторов и групп читаются один раз на весь импорт
+        self.authors = dict(User.objects.values_list('username', 'pk'))
+        self.groups = dict(Group.objects.values_list('slug', 'pk'))
+        self.errors = []
+        last_pk = Post.objects.aggregate(last=Max('pk'))['last'] or 0
+
+        stream = sys.stdin if path == '-' else open(path, encoding='utf-8',
+                                                    newline='')
+        started = time.monotonic()
+        imported = 0
+        touched_authors, touched_groups = set(), set()
+        try:
+            posts = (self.build_post(number, row)
+                     for number, row in read_rows(stream, file_format))
+            posts = (post for post in posts if post is not None)
+            for batch in batched(posts, batch_size):
+                bulk_insert_posts(batch)
+                imported += len(batch)
+                touched_authors.update(post.author_id for post in batch)
+                touched_groups.update(post.group_id for post in batch)
+                if options['verbosity'] > 1:
+                    self.report(imported, started)
+        finally:
+            if stream is not sys.stdin:
+                stream.close()
+
+        get_backend().index_after(last_pk)
+        self.invalidate(touched_authors, touched_groups)
+        self.report(imported, started)
+        for number, error in self.errors:
+            self.stderr.write(f'Строка {number}: {error}')
+        if self.errors:
+            self.stdout.write(f'Пропущено строк с ошибками: '
+                              f'{len(self.errors)}')
+
+    def build_post(self, number, row):
+        """Пост из записи или None, если запись не годится."""
+        error = self.row_error(row)
+        if error:
+            self.errors.append((number, error))
+            return None
+        group_slug = row.get('group') or None
+        return Post(
+            text=row['text'],
+            author_id=self.authors[row['author']],
+            group_id=self.groups[group_slug] if group_slug else None,
+            pub_date=parse_pub_date(row.get('pub_date')) or timezone.now(),
+        )
+
+    def row_error(self, row) -> Optional[str]:
+        if row is None:
+            return 'не разобрать запись'
+        text = row.get('text')
+        if not isinstance(text, str) or not text.strip():
+            return 'нет текста'
+        author = row.get('author')
+        if not isinstance(author, str) or author not in self.authors:
+            return f'неизвестный автор {author!r}'
+        group_slug = row.get('group') or None
+        if group_slug is not None and (not isinstance(group_slug, str)
+                                       or group_slug not in self.groups):
+            return f'неизвестная группа {group_slug!r}'
+        pub_date = row.get('pub_date')
+        if pub_date and parse_pub_date(pub_date) is None:
+            return f'неверная дата {pub_date!r}'
+        return None
+
+    @staticmethod
+    def invalidate(author_ids, group_ids):
+        usernames = User.objects.filter(pk__in=author_ids).values_list(
+            'username', flat=True)
+        slugs = Group.objects.filter(pk__in=group_ids).values_list(
+            'slug', flat=True)
+        invalidate_feed('index')
+        for username in usernames:
+            invalidate_feed('profile', username)
+        for slug in slugs:
+            invalidate_feed('group_posts', slug)
+            feed_store.drop_feed(slug)
+
+    def report(self, imported, started):
+        elapsed = max(time.monotonic() - started, 1e-6)
+        self.stdout.write(
+            f'Загружено постов: {imported} '
+            f'за {elapsed:.1f} с ({imported / elapsed:.0f} постов/с)'
+        )
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from posts import feed_store
+from posts.models import Group
+
+
+class Command(BaseCommand):
+    help = 'Пересобирает списки свежих постов групп из таблицы постов.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('slugs', nargs='*',
+                            help='slug групп; без них пересобираются все')
+
+    def handle(self, *args, **options):
+        slugs = options['slugs'] or Group.objects.values_list(
+            'slug', flat=True).iterator()
+        rebuilt = 0
+        for slug in slugs:
+            feed_store.rebuild_feed(slug)
+            rebuilt += 1
+        self.stdout.write(f'Пересобрано лент групп: {rebuilt}')
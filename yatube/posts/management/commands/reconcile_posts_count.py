@@ -0,0 +1,50 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count
+
+from posts.models import AuthorStats
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = ('Пересчитывает AuthorStats.posts_count по таблице постов '
+            'и исправляет расхождения пачками.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help='только показать расхождения, ничего не записывать'
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        authors = User.objects.annotate(
+            actual=Count('posts')
+        ).values_list('pk', 'actual').order_by('pk')
+        stored = dict(
+            AuthorStats.objects.values_list('author_id', 'posts_count')
+        )
+
+        to_create, to_update = [], []
+        for author_id, actual in authors.iterator():
+            if author_id not in stored:
+                to_create.append(AuthorStats(author_id=author_id,
+                                             posts_count=actual))
+            elif stored[author_id] != actual:
+                to_update.append(AuthorStats(author_id=author_id,
+                                             posts_count=actual))
+
+        if not options['dry_run']:
+            with transaction.atomic():
+                AuthorStats.objects.bulk_create(to_create,
+                                                batch_size=batch_size)
+                AuthorStats.objects.bulk_update(to_update, ['posts_count'],
+                                                batch_size=batch_size)
+
+        self.stdout.write(
+            f'Создано счётчиков: {len(to_create)}, '
+            f'исправлено: {len(to_update)}'
+        )
@@ -0,0 +1,76 @@
+import random
+import time
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand
+from django.db.models import Max
+from django.utils import timezone
+
+from posts.bulk import batched, bulk_insert_posts
+from posts.models import Group, Post
+from posts.search import get_backend
+
+User = get_user_model()
+
+WORDS = (
+    'сегодня вчера город река лес музыка книга кино погода дорога '
+    'работа отпуск кофе утро вечер друзья новости проект код тест'
+).split()
+
+
+class Command(BaseCommand):
+    help = ('Наполняет базу авторами, группами и постами в объёмах, '
+            'близких к боевым, для замеров производительности.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--posts', type=int, default=100000)
+        parser.add_argument('--authors', type=int, default=1000)
+        parser.add_argument('--groups', type=int, default=100)
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        rnd = random.Random(options['seed'])
+        started = time.monotonic()
+        prefix = f'bench{int(time.time())}'
+
+        password = make_password(None)
+        User.objects.bulk_create(
+            (User(username=f'{prefix}_user{i}', password=password)
+             for i in range(options['authors'])),
+            batch_size=options['batch_size'],
+        )
+        Group.objects.bulk_create(
+            (Group(title=f'Группа {i}', slug=f'{prefix}-group{i}',
+                   description='Группа для замеров')
+             for i in range(options['groups'])),
+            batch_size=options['batch_size'],
+        )
+        author_ids = list(User.objects.filter(
+            username__startswith=prefix).values_list('pk', flat=True))
+        group_ids = list(Group.objects.filter(
+            slug__startswith=prefix).values_list('pk', flat=True))
+        group_ids.append(None)
+
+        last_pk = Post.objects.aggregate(last=Max('pk'))['last'] or 0
+        now = timezone.now()
+        posts = (
+            Post(
+                text=' '.join(rnd.choices(WORDS, k=rnd.randint(5, 60))),
+                author_id=rnd.choice(author_ids),
+                group_id=rnd.choice(group_ids),
+                pub_date=now - timedelta(seconds=rnd.randint(0, 10 ** 8)),
+            )
+            for _ in range(options['posts'])
+        )
+        for batch in batched(posts, options['batch_size']):
+            bulk_insert_posts(batch)
+        get_backend().index_after(last_pk)
+
+        self.stdout.write(
+            f'Создано: авторов {len(author_ids)}, групп {len(group_ids) - 1}, '
+            f'постов {options["posts"]} '
+            f'за {time.monotonic() - started:.1f} с'
+        )
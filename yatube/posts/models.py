@@ -12,6 +12,12 @@ class Group(models.Model):
     def __str__(self):
         return self.title
 
+    class Meta:
+        indexes = (
+            # префиксный поиск групп для автодополнения
+            models.Index(fields=('title',), name='group_title_idx'),
+        )
+
 
 class Post(models.Model):
     text = models.TextField(
@@ -24,6 +30,11 @@ class Post(models.Model):
         auto_now_add=True
     )
 
+    modified = models.DateTimeField(
+        'Дата изменения',
+        auto_now=True
+    )
+
     author = models.ForeignKey(
         User,
         on_delete=models.CASCADE,
@@ -46,3 +57,49 @@ class Post(models.Model):
 
     class Meta:
         ordering = ('-pub_date',)
+        indexes = (
+            models.Index(
+                fields=('-pub_date', '-id'),
+                name='post_pub_date_idx',
+            ),
+            models.Index(
+                fields=('group', '-pub_date', '-id'),
+                name='post_group_pub_date_idx',
+            ),
+            models.Index(
+                fields=('author', '-pub_date', '-id'),
+                name='post_author_pub_date_idx',
+            ),
+            # MAX(modified) для Last-Modified лент читается из индекса
+            models.Index(fields=('modified',), name='post_modified_idx'),
+            models.Index(
+                fields=('group', 'modified'),
+                name='post_group_modified_idx',
+            ),
+            models.Index(
+                fields=('author', 'modified'),
+                name='post_author_modified_idx',
+            ),
+        )
+
+
+class AuthorStats(models.Model):
+    author = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='stats',
+        verbose_name='Автор'
+    )
+
+    posts_count = models.PositiveIntegerField(
+        'Количество постов',
+        default=0
+    )
+
+    def __str__(self):
+        return f'{self.author}: {self.posts_count}'
+
+    class Meta:
+        verbose_name = 'Статистика автора'
+        verbose_name_plural = 'Статистика авторов'
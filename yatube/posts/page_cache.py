@@ -0,0 +1,103 @@
+import hashlib
+from functools import wraps
+from typing import Iterable, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+from django.utils.cache import get_conditional_response
+from django.utils.http import parse_http_date_safe
+
+from core.cache import get_or_rebuild, key_part
+
+FEED_PAGE_CACHE_TIMEOUT: int = getattr(
+    settings, 'FEED_PAGE_CACHE_TIMEOUT', 60
+)
+
+
+def feed_version_key(view_name: str, arg: str = '') -> str:
+    return f'feed_page:{view_name}:{key_part(arg)}:version'
+
+
+def feed_changed_key(view_name: str, arg: str = '') -> str:
+    return f'feed_page:{view_name}:{key_part(arg)}:changed'
+
+
+def feed_page_key(view_name: str, arg: str, version: int,
+                  query_string: str) -> str:
+    query = hashlib.md5(query_string.encode()).hexdigest()
+    return f'feed_page:{view_name}:{key_part(arg)}:v{version}:{query}'
+
+
+def bump_version(view_name: str, arg: str) -> None:
+    key = feed_version_key(view_name, arg)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, 2, None)
+    # время сброса попадает в Last-Modified: удаление поста
+    # MAX(modified) не меняет
+    cache.set(feed_changed_key(view_name, arg), timezone.now(), None)
+
+
+def invalidate_feed(view_name: str, arg: str = '') -> None:
+    """Сбрасывает все страницы одной ленты, не трогая остальные.
+
+    Версия растёт сразу и ещё раз после коммита: пока транзакция
+    открыта, параллельный запрос мог положить под новую версию
+    страницу без изменений.
+    """
+    bump_version(view_name, arg)
+    transaction.on_commit(lambda: bump_version(view_name, arg))
+
+
+def invalidate_post_feeds(author_username: str,
+                          group_slugs: Iterable[str] = ()) -> None:
+    invalidate_feed('index')
+    invalidate_feed('profile', author_username)
+    for slug in group_slugs:
+        invalidate_feed('group_posts', slug)
+
+
+def revalidate(request, response):
+    """304 вместо страницы из кеша, если валидаторы клиента совпали."""
+    if response.status_code != 200:
+        return response
+    last_modified = response.get('Last-Modified')
+    return get_conditional_response(
+        request,
+        etag=response.get('ETag'),
+        last_modified=last_modified and parse_http_date_safe(last_modified),
+        response=response,
+    )
+
+
+def cache_anonymous_feed(view_name: str, arg_name: Optional[str] = None):
+    """Кеширует страницы ленты целиком для неавторизованных посетителей.
+
+    Ключ строится из имени ленты, её аргумента (slug, username),
+    версии ленты и строки запроса с номером страницы или курсором.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if (not FEED_PAGE_CACHE_TIMEOUT
+                    or request.method != 'GET'
+                    or request.user.is_authenticated):
+                return view(request, *args, **kwargs)
+
+            arg = str(kwargs.get(arg_name, '')) if arg_name else ''
+            version = cache.get(feed_version_key(view_name, arg), 1)
+            key = feed_page_key(view_name, arg, version,
+                                request.GET.urlencode())
+            # после сброса ленты страницу пересобирает один воркер
+            response = get_or_rebuild(
+                cache, key,
+                lambda: view(request, *args, **kwargs),
+                FEED_PAGE_CACHE_TIMEOUT,
+                cacheable=lambda response: response.status_code == 200,
+            )
+            return revalidate(request, response)
+        return wrapper
+    return decorator
@@ -0,0 +1,131 @@
+import base64
+from typing import Optional, Tuple
+
+from django.core.paginator import Page, Paginator
+from django.db.models import Q, QuerySet
+from django.utils.dateparse import parse_datetime
+
+NEXT: str = 'n'
+PREVIOUS: str = 'p'
+
+
+def encode_cursor(direction: str, post) -> str:
+    raw = f'{direction}|{post.pub_date.isoformat()}|{post.pk}'
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor: Optional[str]) -> Optional[Tuple]:
+    """Разбирает курсор, для битого курсора возвращает None."""
+    if not cursor:
+        return None
+    try:
+        padding = '=' * (-len(cursor) % 4)
+        raw = base64.urlsafe_b64decode(cursor + padding).decode()
+        direction, pub_date, pk = raw.split('|')
+        pub_date = parse_datetime(pub_date)
+        pk = int(pk)
+    except (ValueError, UnicodeDecodeError):
+        return None
+    if direction not in (NEXT, PREVIOUS) or pub_date is None:
+        return None
+    return direction, pub_date, pk
+
+
+class CursorPage(Page):
+    """Страница keyset-пагинации: без номера и без общего числа страниц.
+
+    Пустая страница (курсор после удалений или подделанный) не ссылается
+    ни вперёд, ни назад: курсор строится от первой и последней записи.
+    """
+
+    is_cursor_page: bool = True
+
+    def __init__(self, object_list, paginator,
+                 has_next: bool, has_previous: bool):
+        super().__init__(object_list, None, paginator)
+        self._has_next = has_next and bool(object_list)
+        self._has_previous = has_previous and bool(object_list)
+
+    def __repr__(self):
+        return f'<Cursor page of {len(self.object_list)} posts>'
+
+    def has_next(self) -> bool:
+        return self._has_next
+
+    def has_previous(self) -> bool:
+        return self._has_previous
+
+    @property
+    def next_cursor(self) -> Optional[str]:
+        if not self._has_next or not self.object_list:
+            return None
+        return encode_cursor(NEXT, self.object_list[-1])
+
+    @property
+    def previous_cursor(self) -> Optional[str]:
+        if not self._has_previous or not self.object_list:
+            return None
+        return encode_cursor(PREVIOUS, self.object_list[0])
+
+    def next_page_number(self):
+        return self.next_cursor
+
+    def previous_page_number(self):
+        return self.previous_cursor
+
+    def start_index(self):
+        return None
+
+    def end_index(self):
+        return None
+
+
+class CursorPaginator(Paginator):
+    """Пагинатор по ключу (pub_date, id).
+
+    Каждая страница выбирается одним запросом с LIMIT и условием
+    на ключ последней показанной записи, без OFFSET и COUNT(*).
+    """
+
+    ordering = ('-pub_date', '-pk')
+
+    def __init__(self, object_list: QuerySet, per_page: int):
+        super().__init__(object_list.order_by(*self.ordering), per_page)
+
+    def page_queryset(self, cursor: Optional[str]) -> QuerySet:
+        """Запрос одной страницы: LIMIT per_page + 1 от ключа курсора."""
+        return self._page_queryset(decode_cursor(cursor))
+
+    def get_page(self, cursor: Optional[str]) -> CursorPage:
+        decoded = decode_cursor(cursor)
+        posts = list(self._page_queryset(decoded))
+        has_more = len(posts) > self.per_page
+        posts = posts[:self.per_page]
+
+        if decoded is None:
+            return CursorPage(posts, self, has_next=has_more,
+                              has_previous=False)
+        # записи по ту сторону курсора есть, если страница от него
+        # вообще что-то нашла: курсор указывает на соседнюю страницу
+        if decoded[0] == NEXT:
+            return CursorPage(posts, self, has_next=has_more,
+                              has_previous=bool(posts))
+        posts.reverse()
+        return CursorPage(posts, self, has_next=bool(posts),
+                          has_previous=has_more)
+
+    def _page_queryset(self, decoded: Optional[Tuple]) -> QuerySet:
+        queryset = self.object_list
+        if decoded is not None:
+            direction, pub_date, pk = decoded
+            # отдельная граница по pub_date даёт поиск по индексу,
+            # а не обход индекса от самой свежей записи
+            if direction == NEXT:
+                queryset = queryset.filter(pub_date__lte=pub_date).filter(
+                    Q(pub_date__lt=pub_date) | Q(pk__lt=pk)
+                )
+            else:
+                queryset = queryset.filter(pub_date__gte=pub_date).filter(
+                    Q(pub_date__gt=pub_date) | Q(pk__gt=pk)
+                ).order_by('pub_date', 'pk')
+        return queryset[:self.per_page + 1]
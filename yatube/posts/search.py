@@ -0,0 +1,266 @@
+import math
+import re
+import threading
+from collections import Counter, defaultdict
+from typing import Dict, List
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+
+from .models import Post
+
+FTS_TABLE: str = 'posts_post_fts'
+GENERATION_KEY: str = 'post_search:generation'
+# id в одном DELETE: старые SQLite ограничивают запрос 999 параметрами
+REMOVE_BATCH_SIZE: int = 500
+
+TOKEN_RE = re.compile(r'\w+')
+
+
+def tokenize(text: str) -> List[str]:
+    return TOKEN_RE.findall(text.lower())
+
+
+class Fts5SearchBackend:
+    """Индекс SQLite FTS5: rowid виртуальной таблицы равен id поста."""
+
+    name = 'fts5'
+
+    def index(self, post_id: int, text: str) -> None:
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'INSERT OR REPLACE INTO {FTS_TABLE}(rowid, text) '
+                'VALUES (%s, %s)',
+                [post_id, text],
+            )
+
+    def remove(self, post_id: int) -> None:
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', [post_id]
+            )
+
+    def remove_many(self, post_ids: List[int]) -> None:
+        with connection.cursor() as cursor:
+            for start in range(0, len(post_ids), REMOVE_BATCH_SIZE):
+                chunk = post_ids[start:start + REMOVE_BATCH_SIZE]
+                placeholders = ', '.join(['%s'] * len(chunk))
+                cursor.execute(
+                    f'DELETE FROM {FTS_TABLE} '
+                    f'WHERE rowid IN ({placeholders})',
+                    chunk,
+                )
+
+    def index_after(self, post_id: int) -> None:
+        """Индексирует посты, загруженные мимо сигналов (bulk_create)."""
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'INSERT OR REPLACE INTO {FTS_TABLE}(rowid, text) '
+                'SELECT id, text FROM posts_post WHERE id > %s',
+                [post_id],
+            )
+
+    def count(self, query: str) -> int:
+        match = self.match_expression(query)
+        if not match:
+            return 0
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'SELECT COUNT(*) FROM {FTS_TABLE} '
+                f'WHERE {FTS_TABLE} MATCH %s',
+                [match],
+            )
+            return cursor.fetchone()[0]
+
+    def ranked_ids(self, query: str, offset: int, limit: int) -> List[int]:
+        match = self.match_expression(query)
+        if not match:
+            return []
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'SELECT rowid FROM {FTS_TABLE} '
+                f'WHERE {FTS_TABLE} MATCH %s '
+                'ORDER BY rank, rowid DESC LIMIT %s OFFSET %s',
+                [match, limit, offset],
+            )
+            return [row[0] for row in cursor.fetchall()]
+
+    @staticmethod
+    def match_expression(query: str) -> str:
+        # каждое слово в кавычках: синтаксис FTS5 из запроса не проходит
+        return ' '.join(f'"{token}"' for token in tokenize(query))
+
+
+class InvertedIndexBackend:
+    """Обратный индекс в памяти процесса для баз без FTS5.
+
+    Индекс строится из таблицы постов при первом поиске и дальше
+    обновляется сохранениями постов. Сохранение в другом процессе
+    меняет поколение в кеше, и этот процесс перестраивает индекс.
+    """
+
+    name = 'python'
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._postings: Dict[str, Dict[int, int]] = defaultdict(dict)
+        self._lengths: Dict[int, int] = {}
+        self._tokens: Dict[int, set] = {}
+        self._generation = None
+
+    def index(self, post_id: int, text: str) -> None:
+        def change():
+            self._remove(post_id)
+            self._add(post_id, text)
+        self._apply(change)
+
+    def remove(self, post_id: int) -> None:
+        self._apply(lambda: self._remove(post_id))
+
+    def remove_many(self, post_ids: List[int]) -> None:
+        def change():
+            for post_id in post_ids:
+                self._remove(post_id)
+        self._apply(change)
+
+    def index_after(self, post_id: int) -> None:
+        # все процессы перестроят индекс при следующем поиске
+        with self._lock:
+            self._generation = None
+            self._bump_generation()
+
+    def count(self, query: str) -> int:
+        return len(self._scores(query))
+
+    def ranked_ids(self, query: str, offset: int, limit: int) -> List[int]:
+        scores = self._scores(query)
+        ranked = sorted(scores, key=lambda pk: (-scores[pk], -pk))
+        return ranked[offset:offset + limit]
+
+    def rebuild(self) -> None:
+        with self._lock:
+            self._postings.clear()
+            self._lengths.clear()
+            self._tokens.clear()
+            posts = Post.objects.values_list('pk', 'text').iterator()
+            for post_id, text in posts:
+                self._add(post_id, text)
+            cache.add(GENERATION_KEY, 0, None)
+            self._generation = cache.get(GENERATION_KEY)
+
+    def _scores(self, query: str) -> Dict[int, float]:
+        tokens = set(tokenize(query))
+        if not tokens:
+            return {}
+        with self._lock:
+            self._ensure_built()
+            postings = [self._postings.get(token, {}) for token in tokens]
+            if not all(postings):
+                return {}
+            matched = set.intersection(*(set(p) for p in postings))
+            total = len(self._lengths)
+            scores = Counter()
+            for posting in postings:
+                idf = math.log(1 + total / len(posting))
+                for post_id in matched:
+                    tf = posting[post_id] / self._lengths[post_id]
+                    scores[post_id] += tf * idf
+            return scores
+
+    def _apply(self, change) -> None:
+        # процесс, который ещё не искал, индекс не строит, а только
+        # двигает поколение, чтобы остальные процессы заметили запись
+        with self._lock:
+            current = (self._generation is not None
+                       and self._generation == cache.get(GENERATION_KEY))
+            if current:
+                change()
+            generation = self._bump_generation()
+            if current and generation == self._generation + 1:
+                self._generation = generation
+            else:
+                self._generation = None
+
+    def _ensure_built(self) -> None:
+        if (self._generation is None
+                or self._generation != cache.get(GENERATION_KEY)):
+            self.rebuild()
+
+    def _add(self, post_id: int, text: str) -> None:
+        tokens = tokenize(text)
+        for token, tf in Counter(tokens).items():
+            self._postings[token][post_id] = tf
+        self._lengths[post_id] = max(len(tokens), 1)
+        self._tokens[post_id] = set(tokens)
+
+    def _remove(self, post_id: int) -> None:
+        for token in self._tokens.pop(post_id, ()):
+            posting = self._postings[token]
+            posting.pop(post_id, None)
+            if not posting:
+                del self._postings[token]
+        self._lengths.pop(post_id, None)
+
+    @staticmethod
+    def _bump_generation():
+        cache.add(GENERATION_KEY, 0, None)
+        try:
+            return cache.incr(GENERATION_KEY)
+        except ValueError:
+            cache.set(GENERATION_KEY, 1, None)
+            return 1
+
+
+class SearchResults:
+    """Ленивая выдача поиска: её можно отдать в Paginator."""
+
+    def __init__(self, backend, query: str):
+        self.backend = backend
+        self.query = query
+
+    def count(self) -> int:
+        return self.backend.count(self.query)
+
+    def __len__(self):
+        return self.count()
+
+    def __getitem__(self, item):
+        if not isinstance(item, slice):
+            return self[item:item + 1][0]
+        offset = item.start or 0
+        limit = item.stop - offset
+        ids = self.backend.ranked_ids(self.query, offset, limit)
+        posts = Post.objects.select_related('author', 'group').in_bulk(ids)
+        return [posts[pk] for pk in ids if pk in posts]
+
+    def ids(self, limit: int) -> List[int]:
+        return self.backend.ranked_ids(self.query, 0, limit)
+
+
+_python_backend = InvertedIndexBackend()
+_fts5_aliases = set()
+
+
+def fts5_available() -> bool:
+    if connection.alias in _fts5_aliases:
+        return True
+    if connection.vendor != 'sqlite':
+        return False
+    if FTS_TABLE in connection.introspection.table_names():
+        _fts5_aliases.add(connection.alias)
+        return True
+    return False
+
+
+def get_backend():
+    name = getattr(settings, 'POSTS_SEARCH_BACKEND', None)
+    if name == 'python':
+        return _python_backend
+    if name == 'fts5' or fts5_available():
+        return Fts5SearchBackend()
+    return _python_backend
+
+
+def search_posts(query: str) -> SearchResults:
+    return SearchResults(get_backend(), query)
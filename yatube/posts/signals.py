@@ -0,0 +1,139 @@
+import threading
+
+from django.contrib.auth import get_user_model
+from django.db.models import F
+from django.db.models.signals import (
+    post_delete, post_save, pre_delete, pre_save,
+)
+from django.dispatch import receiver
+
+from . import feed_store
+from .fragments import bump_card_version
+from .group_choices import invalidate_group_choices
+from .models import AuthorStats, Group, Post
+from .page_cache import invalidate_feed, invalidate_post_feeds
+from .search import get_backend
+
+User = get_user_model()
+
+# посты авторов, которых удаляют прямо сейчас: каскад удаляет их
+# по одному, а сбросы и переиндексацию делает один раз user_deleted
+_deleting = threading.local()
+
+
+def deleting_authors() -> dict:
+    if not hasattr(_deleting, 'authors'):
+        _deleting.authors = {}
+    return _deleting.authors
+
+
+def change_posts_count(author_id: int, delta: int) -> None:
+    updated = AuthorStats.objects.filter(author_id=author_id).update(
+        posts_count=F('posts_count') + delta
+    )
+    if not updated and delta > 0:
+        # строки ещё нет: считаем один раз, дальше только инкременты
+        AuthorStats.objects.get_or_create(
+            author_id=author_id,
+            defaults={
+                'posts_count': Post.objects.filter(author_id=author_id).count()
+            },
+        )
+
+
+def group_slugs(*group_ids: int) -> dict:
+    group_ids = {group_id for group_id in group_ids if group_id}
+    if not group_ids:
+        return {}
+    return dict(Group.objects.filter(pk__in=group_ids).values_list(
+        'pk', 'slug'
+    ))
+
+
+@receiver(pre_save, sender=Post)
+def remember_old_group(sender, instance, **kwargs):
+    # post_edit запоминает группу сам, когда загружает пост
+    if instance.pk is not None and not hasattr(instance, '_old_group_id'):
+        instance._old_group_id = Post.objects.filter(
+            pk=instance.pk
+        ).values_list('group_id', flat=True).first()
+
+
+@receiver(post_save, sender=Post)
+def post_saved(sender, instance, created, **kwargs):
+    old_group_id = instance.__dict__.pop('_old_group_id', None)
+    if created:
+        change_posts_count(instance.author_id, 1)
+    else:
+        bump_card_version(instance.pk)
+    slugs = group_slugs(instance.group_id, old_group_id)
+    invalidate_post_feeds(instance.author.username, slugs.values())
+    get_backend().index(instance.pk, instance.text)
+
+    if feed_store.GROUP_FEED_STORE:
+        moved = created or old_group_id != instance.group_id
+        old_slug = slugs.get(old_group_id)
+        new_slug = slugs.get(instance.group_id)
+        if old_slug and moved:
+            feed_store.remove_post(old_slug, instance.pk)
+        if new_slug and moved:
+            feed_store.add_post(new_slug, instance)
+
+
+@receiver(post_delete, sender=Post)
+def post_deleted(sender, instance, **kwargs):
+    cascade = deleting_authors().get(instance.author_id)
+    if cascade is not None and instance.pk in cascade:
+        return
+    change_posts_count(instance.author_id, -1)
+    slugs = group_slugs(instance.group_id)
+    invalidate_post_feeds(instance.author.username, slugs.values())
+    get_backend().remove(instance.pk)
+
+    if feed_store.GROUP_FEED_STORE and instance.group_id in slugs:
+        feed_store.remove_post(slugs[instance.group_id], instance.pk)
+
+
+@receiver(pre_save, sender=Group)
+def group_slug_changing(sender, instance, **kwargs):
+    # лента под старым slug больше никому не нужна
+    if instance.pk is None:
+        return
+    old_slug = Group.objects.filter(pk=instance.pk).values_list(
+        'slug', flat=True
+    ).first()
+    if old_slug and old_slug != instance.slug:
+        invalidate_feed('group_posts', old_slug)
+        feed_store.drop_feed(old_slug)
+
+
+@receiver(post_save, sender=Group)
+@receiver(post_delete, sender=Group)
+def group_changed(sender, instance, **kwargs):
+    invalidate_feed('group_posts', instance.slug)
+    invalidate_feed('index')
+    feed_store.drop_feed(instance.slug)
+    invalidate_group_choices()
+
+
+@receiver(pre_delete, sender=User)
+def user_deleting(sender, instance, **kwargs):
+    # AuthorStats удаляется каскадом вместе с автором, счётчик не нужен
+    deleting_authors()[instance.pk] = dict(
+        Post.objects.filter(author_id=instance.pk).values_list(
+            'pk', 'group_id'
+        )
+    )
+
+
+@receiver(post_delete, sender=User)
+def user_deleted(sender, instance, **kwargs):
+    posts = deleting_authors().pop(instance.pk, None)
+    if not posts:
+        return
+    slugs = group_slugs(*posts.values())
+    invalidate_post_feeds(instance.username, slugs.values())
+    get_backend().remove_many(list(posts))
+    if feed_store.GROUP_FEED_STORE:
+        for slug in slugs.values():
+            feed_store.drop_feed(slug)
@@ -0,0 +1,224 @@
+from functools import partial
+from typing import Callable, Iterator
+from xml.sax.saxutils import escape, quoteattr
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Max
+from django.http import Http404, StreamingHttpResponse
+from django.urls import reverse
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import require_safe
+
+from core.cache import key_part
+
+from .conditional import feed_condition
+from .models import Group, Post, User
+
+SITEMAP_SHARD_SIZE: int = getattr(settings, 'SITEMAP_SHARD_SIZE', 50000)
+SYNDICATION_ITEMS: int = getattr(settings, 'SYNDICATION_ITEMS', 50)
+SYNDICATION_MAX_AGE: int = getattr(settings, 'SYNDICATION_MAX_AGE', 3600)
+# документы больше этого не кешируются целиком, только отдаются потоком
+SYNDICATION_CACHE_MAX_BYTES: int = 1024 * 1024
+SYNDICATION_CACHE_TIMEOUT: int = 24 * 60 * 60
+CHUNK_SIZE: int = 2000
+
+SITEMAP_NS = 'http://www.sitemaps.org/schemas/sitemap/0.9'
+XML_HEADER = '<?xml version="1.0" encoding="UTF-8"?>\n'
+
+
+def post_urls(low: int, high: int) -> Iterator:
+    rows = Post.objects.filter(pk__gt=low, pk__lte=high).order_by(
+        'pk'
+    ).values_list('pk', 'modified')
+    for pk, modified in rows.iterator(chunk_size=CHUNK_SIZE):
+        yield reverse('posts:post_detail', kwargs={'post_id': pk}), modified
+
+
+def group_urls(low: int, high: int) -> Iterator:
+    rows = Group.objects.filter(pk__gt=low, pk__lte=high).order_by(
+        'pk'
+    ).values_list('slug', flat=True)
+    for slug in rows.iterator(chunk_size=CHUNK_SIZE):
+        yield reverse('posts:group_list', kwargs={'slug': slug}), None
+
+
+def author_urls(low: int, high: int) -> Iterator:
+    rows = User.objects.filter(
+        pk__gt=low, pk__lte=high, stats__posts_count__gt=0
+    ).order_by('pk').values_list('username', flat=True)
+    for username in rows.iterator(chunk_size=CHUNK_SIZE):
+        yield reverse('posts:profile', kwargs={'username': username}), None
+
+
+# раздел карты сайта: модель для числа шардов и адреса в диапазоне id
+SITEMAP_SECTIONS = {
+    'posts': (Post, post_urls),
+    'groups': (Group, group_urls),
+    'authors': (User, author_urls),
+}
+
+
+def shard_count(model) -> int:
+    max_pk = model.objects.aggregate(max_pk=Max('pk'))['max_pk'] or 0
+    return max(1, -(-max_pk // SITEMAP_SHARD_SIZE))
+
+
+def sitemap_index(base_url: str) -> Iterator[str]:
+    yield XML_HEADER
+    yield f'<sitemapindex xmlns="{SITEMAP_NS}">\n'
+    for section, (model, _) in SITEMAP_SECTIONS.items():
+        for shard in range(shard_count(model)):
+            path = reverse('posts:sitemap_section',
+                           kwargs={'section': section, 'shard': shard})
+            loc = escape(base_url + path)
+            yield f'<sitemap><loc>{loc}</loc></sitemap>\n'
+    yield '</sitemapindex>\n'
+
+
+def sitemap_shard(base_url: str, urls: Callable, shard: int) -> Iterator[str]:
+    """Адреса одного шарда: id в (shard * размер, (shard + 1) * размер]."""
+    yield XML_HEADER
+    yield f'<urlset xmlns="{SITEMAP_NS}">\n'
+    low = shard * SITEMAP_SHARD_SIZE
+    for path, modified in urls(low, low + SITEMAP_SHARD_SIZE):
+        lastmod = (f'<lastmod>{modified.isoformat()}</lastmod>'
+                   if modified else '')
+        yield f'<url><loc>{escape(base_url + path)}</loc>{lastmod}</url>\n'
+    yield '</urlset>\n'
+
+
+def atom_feed(base_url: str, title: str, page_path: str, feed_path: str,
+              posts, updated) -> Iterator[str]:
+    """Atom: шапка ленты и SYNDICATION_ITEMS свежих постов."""
+    page_url = escape(base_url + page_path)
+    updated = (updated.isoformat() if updated
+               else '1970-01-01T00:00:00+00:00')
+    yield XML_HEADER
+    yield '<feed xmlns="http://www.w3.org/2005/Atom">\n'
+    yield f'<title>{escape(title)}</title>\n'
+    yield f'<id>{page_url}</id>\n'
+    yield f'<updated>{updated}</updated>\n'
+    yield f'<link href={quoteattr(base_url + page_path)}/>\n'
+    yield f'<link rel="self" href={quoteattr(base_url + feed_path)}/>\n'
+
+    rows = posts.order_by('-pub_date', '-pk').values_list(
+        'pk', 'text', 'pub_date', 'modified', 'author__username'
+    )[:SYNDICATION_ITEMS]
+    for pk, text, pub_date, modified, author in rows.iterator(
+            chunk_size=CHUNK_SIZE):
+        post_url = base_url + reverse('posts:post_detail',
+                                      kwargs={'post_id': pk})
+        yield (
+            '<entry>'
+            f'<id>{escape(post_url)}</id>'
+            f'<title>{escape(text[:80])}</title>'
+            f'<link href={quoteattr(post_url)}/>'
+            f'<author><name>{escape(author)}</name></author>'
+            f'<published>{pub_date.isoformat()}</published>'
+            f'<updated>{modified.isoformat()}</updated>'
+            f'<content type="text">{escape(text)}</content>'
+            '</entry>\n'
+        )
+    yield '</feed>\n'
+
+
+def tee_to_cache(key: str, chunks: Iterator[str]) -> Iterator[str]:
+    """Отдаёт документ потоком и по пути складывает его в кеш."""
+    parts, size = [], 0
+    for chunk in chunks:
+        size += len(chunk)
+        if parts is not None:
+            parts.append(chunk)
+            if size > SYNDICATION_CACHE_MAX_BYTES:
+                parts = None
+        yield chunk
+    if parts is not None:
+        cache.set(key, ''.join(parts), SYNDICATION_CACHE_TIMEOUT)
+
+
+def site_url(request) -> str:
+    return request.build_absolute_uri('/')[:-1]
+
+
+def xml_response(request, build: Callable[[], Iterator[str]],
+                 content_type: str) -> StreamingHttpResponse:
+    """Документ из кеша или потоком из build().
+
+    Ключ строится из ETag, то есть из даты последнего изменения и версии
+    ленты: новый пост даёт новый ключ, старый документ просто истекает.
+    """
+    etag = getattr(request, 'conditional_etag', None)
+    key = f'syndication:{key_part(site_url(request) + request.path)}:{etag}'
+    body = cache.get(key) if etag else None
+    if body is not None:
+        chunks = [body]
+    elif etag:
+        chunks = tee_to_cache(key, build())
+    else:
+        chunks = build()
+    return StreamingHttpResponse(
+        chunks, content_type=f'{content_type}; charset=utf-8'
+    )
+
+
+@require_safe
+@cache_control(public=True, max_age=SYNDICATION_MAX_AGE)
+@feed_condition('sitemap', 'index')
+def sitemap(request):
+    return xml_response(
+        request, partial(sitemap_index, site_url(request)), 'application/xml'
+    )
+
+
+@require_safe
+@cache_control(public=True, max_age=SYNDICATION_MAX_AGE)
+@feed_condition('sitemap', 'index')
+def sitemap_section(request, section, shard):
+    if section not in SITEMAP_SECTIONS:
+        raise Http404
+    model, urls = SITEMAP_SECTIONS[section]
+    # шард за последним id пуст: 404, а не пустой urlset в кеше
+    if shard >= shard_count(model):
+        raise Http404
+    return xml_response(
+        request, partial(sitemap_shard, site_url(request), urls, shard),
+        'application/xml'
+    )
+
+
+@require_safe
+@cache_control(public=True, max_age=SYNDICATION_MAX_AGE)
+@feed_condition('atom', 'group_posts', 'slug', 'group__slug')
+def group_feed(request, slug):
+    def build():
+        group = Group.objects.filter(slug=slug).values('title').first()
+        if group is None:
+            raise Http404
+        return atom_feed(
+            site_url(request),
+            f'Записи сообщества {group["title"]}',
+            reverse('posts:group_list', kwargs={'slug': slug}),
+            request.path,
+            Post.objects.filter(group__slug=slug),
+            request.conditional_last_modified,
+        )
+    return xml_response(request, build, 'application/atom+xml')
+
+
+@require_safe
+@cache_control(public=True, max_age=SYNDICATION_MAX_AGE)
+@feed_condition('atom', 'profile', 'username', 'author__username')
+def author_feed(request, username):
+    def build():
+        if not User.objects.filter(username=username).exists():
+            raise Http404
+        return atom_feed(
+            site_url(request),
+            f'Все посты пользователя {username}',
+            reverse('posts:profile', kwargs={'username': username}),
+            request.path,
+            Post.objects.filter(author__username=username),
+            request.conditional_last_modified,
+        )
+    return xml_response(request, build, 'application/atom+xml')
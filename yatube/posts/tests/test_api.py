@@ -0,0 +1,94 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, Client
+from django.urls import reverse
+
+from ..models import Group, Post
+
+User = get_user_model()
+
+
+class FeedApiTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='Nameless')
+        cls.group = Group.objects.create(
+            title='Test-group', slug='t-group', description='test-description'
+        )
+        for i in range(1, 14):
+            Post.objects.create(text='Тестовый текст ' + str(i),
+                                author=cls.author, group=cls.group)
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+
+    def test_feeds_return_projected_posts(self):
+        urls = (
+            reverse('posts:api_index'),
+            reverse('posts:api_group_list', kwargs={'slug': 't-group'}),
+            reverse('posts:api_profile', kwargs={'username': 'Nameless'}),
+        )
+        newest = Post.objects.order_by('-pub_date', '-pk').first()
+        for url in urls:
+            with self.subTest(url=url):
+                data = self.guest_client.get(url).json()
+                self.assertEqual(len(data['results']), 10)
+                self.assertEqual(data['results'][0], {
+                    'id': newest.pk,
+                    'text': newest.text,
+                    'pub_date': newest.pub_date.isoformat(),
+                    'author': 'Nameless',
+                    'group': 't-group',
+                })
+                rest = self.guest_client.get(
+                    url, {'cursor': data['next']}).json()
+                self.assertEqual(len(rest['results']), 3)
+                self.assertIsNone(rest['next'])
+
+    def test_profile_and_group_headers(self):
+        data = self.guest_client.get(
+            reverse('posts:api_profile', kwargs={'username': 'Nameless'})
+        ).json()
+        self.assertEqual(data['author'],
+                         {'username': 'Nameless', 'posts_count': 13})
+        data = self.guest_client.get(
+            reverse('posts:api_group_list', kwargs={'slug': 't-group'})
+        ).json()
+        self.assertEqual(data['group']['title'], 'Test-group')
+
+    def test_missing_objects_return_404(self):
+        urls = (
+            reverse('posts:api_group_list', kwargs={'slug': 'missing'}),
+            reverse('posts:api_profile', kwargs={'username': 'missing'}),
+            reverse('posts:api_post_detail', kwargs={'post_id': 10 ** 6}),
+        )
+        for url in urls:
+            with self.subTest(url=url):
+                self.assertEqual(self.guest_client.get(url).status_code, 404)
+
+    def test_matching_etag_returns_304_with_one_query(self):
+        url = reverse('posts:api_index')
+        response = self.guest_client.get(url)
+        self.assertTrue(response.has_header('Last-Modified'))
+        with self.assertNumQueries(1):
+            cached = self.guest_client.get(
+                url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(cached.status_code, 304)
+        self.assertEqual(cached.content, b'')
+
+    def test_edit_changes_etag(self):
+        post = Post.objects.first()
+        urls = (
+            reverse('posts:api_index'),
+            reverse('posts:api_post_detail', kwargs={'post_id': post.pk}),
+        )
+        etags = [self.guest_client.get(url)['ETag'] for url in urls]
+        post.text = 'Новый текст'
+        post.save()
+        for url, etag in zip(urls, etags):
+            with self.subTest(url=url):
+                response = self.guest_client.get(
+                    url, HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(response.status_code, 200)
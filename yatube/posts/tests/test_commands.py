@@ -0,0 +1,177 @@
+import os
+import tempfile
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+
+from ..models import AuthorStats, Group, Post
+from ..paginators import NEXT, CursorPaginator, encode_cursor
+from ..search import search_posts
+
+User = get_user_model()
+
+
+class ExplainFeedsCommandTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='Nameless')
+        cls.group = Group.objects.create(
+            title='Test-group', slug='t-group', description='test-description'
+        )
+        for i in range(1, 14):
+            Post.objects.create(
+                text='Тестовый текст ' + str(i),
+                author=cls.author,
+                group=cls.group,
+            )
+
+    def test_feed_queries_use_indexes(self):
+        out = StringIO()
+        call_command('explain_feeds', stdout=out)
+        output = out.getvalue()
+        for feed in ('index', 'group_posts', 'profile'):
+            with self.subTest(feed=feed):
+                self.assertIn(f'--- {feed} (first page)', output)
+        self.assertIn('Все запросы лент идут по индексам', output)
+
+    def test_cursor_query_walking_index_fails(self):
+        """Обход индекса от свежей записи на странице курсора — ошибка."""
+        def walk_index(paginator, cursor):
+            return paginator.object_list[:paginator.per_page + 1]
+
+        with mock.patch.object(CursorPaginator, 'page_queryset',
+                               walk_index):
+            with self.assertRaisesMessage(CommandError, 'next cursor'):
+                call_command('explain_feeds', stdout=StringIO())
+
+
+class ReconcilePostsCountCommandTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='Nameless')
+        cls.reader = User.objects.create_user(username='Reader')
+        for i in range(1, 4):
+            Post.objects.create(text='Тестовый текст ' + str(i),
+                                author=cls.author)
+
+    def test_drift_is_repaired(self):
+        AuthorStats.objects.filter(author=self.author).update(posts_count=42)
+        call_command('reconcile_posts_count', stdout=StringIO())
+        self.assertEqual(
+            AuthorStats.objects.get(author=self.author).posts_count, 3)
+        self.assertEqual(
+            AuthorStats.objects.get(author=self.reader).posts_count, 0)
+
+
+class ImportExportPostsCommandTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='Nameless')
+        cls.group = Group.objects.create(
+            title='Test-group', slug='t-group', description='test-description'
+        )
+        for i in range(1, 6):
+            Post.objects.create(text='Тестовый текст ' + str(i),
+                                author=cls.author, group=cls.group)
+
+    def roundtrip(self, file_format):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, f'posts.{file_format}')
+            call_command('export_posts', path, stdout=StringIO(),
+                         stderr=StringIO())
+            exported = list(Post.objects.values_list(
+                'text', 'author', 'group', 'pub_date').order_by('pk'))
+            Post.objects.all().delete()
+            call_command('import_posts', path, batch_size=2,
+                         stdout=StringIO())
+        imported = list(Post.objects.values_list(
+            'text', 'author', 'group', 'pub_date').order_by('pk'))
+        self.assertEqual(imported, exported)
+        self.assertEqual(
+            AuthorStats.objects.get(author=self.author).posts_count, 5)
+        self.assertEqual(search_posts('тестовый').count(), 5)
+
+    def test_ndjson_roundtrip(self):
+        self.roundtrip('ndjson')
+
+    def test_csv_roundtrip(self):
+        self.roundtrip('csv')
+
+    def test_imported_pub_date_matches_itself(self):
+        """Дата импортированного поста ищется и сравнивается как своя."""
+        self.roundtrip('ndjson')
+        for post in Post.objects.all():
+            with self.subTest(post=post.pk):
+                self.assertTrue(Post.objects.filter(
+                    pub_date=post.pub_date, pk=post.pk).exists())
+                self.assertFalse(Post.objects.filter(
+                    pub_date__gt=post.pub_date, pk=post.pk).exists())
+
+        expected = list(Post.objects.order_by('-pub_date', '-pk'))
+        paginator = CursorPaginator(Post.objects.all(), 2)
+        page = paginator.get_page(encode_cursor(NEXT, expected[-2]))
+        seen = list(page)
+        while page.has_previous():
+            page = paginator.get_page(page.previous_cursor)
+            seen[:0] = page
+        self.assertEqual(seen, expected)
+
+    def test_unknown_author_is_skipped(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'posts.ndjson')
+            with open(path, 'w', encoding='utf-8') as stream:
+                stream.write('{"text": "Чужой", "author": "nobody"}\n')
+                stream.write('{"text": "Свой", "author": "Nameless"}\n')
+            out = StringIO()
+            call_command('import_posts', path, stdout=out)
+        self.assertIn('Пропущено строк', out.getvalue())
+        self.assertTrue(Post.objects.filter(text='Свой').exists())
+        self.assertFalse(Post.objects.filter(text='Чужой').exists())
+
+    def test_bad_rows_are_reported_not_fatal(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'posts.ndjson')
+            with open(path, 'w', encoding='utf-8') as stream:
+                stream.write('{"author": "Nameless"}\n')
+                stream.write('{"text": "Битый", \n')
+                stream.write('{"text": "Дата", "author": "Nameless", '
+                             '"pub_date": "вчера"}\n')
+                stream.write('{"text": "Группа", "author": "Nameless", '
+                             '"group": "nope"}\n')
+                stream.write('{"text": "Свой", "author": "Nameless", '
+                             '"pub_date": "2020-01-02T03:04:05"}\n')
+            out, err = StringIO(), StringIO()
+            call_command('import_posts', path, stdout=out, stderr=err)
+        self.assertIn('Пропущено строк с ошибками: 4', out.getvalue())
+        for number in range(1, 5):
+            self.assertIn(f'Строка {number}:', err.getvalue())
+        post = Post.objects.get(text='Свой')
+        self.assertEqual(post.pub_date.isoformat(),
+                         '2020-01-02T03:04:05+00:00')
+
+
+class BenchmarkCommandsTests(TestCase):
+    def test_seed_and_benchmark(self):
+        call_command('seed_posts', posts=60, authors=3, groups=2,
+                     batch_size=25, stdout=StringIO())
+        self.assertEqual(Post.objects.count(), 60)
+        with tempfile.TemporaryDirectory() as tmp:
+            baseline = os.path.join(tmp, 'baseline.json')
+            out = StringIO()
+            cache.set('keep', 1)
+            call_command('benchmark_views', requests=2, baseline=baseline,
+                         stdout=out)
+            self.assertEqual(cache.get('keep'), 1)
+            self.assertIn('База сохранена', out.getvalue())
+            self.assertIn('post_detail', out.getvalue())
+            out = StringIO()
+            call_command('benchmark_views', requests=2, baseline=baseline,
+                         threshold=1000, stdout=out)
+            self.assertIn('Регрессий нет', out.getvalue())
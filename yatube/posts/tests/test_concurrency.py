@@ -0,0 +1,67 @@
+import threading
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connections
+from django.http import Http404
+from django.test import TransactionTestCase, Client, override_settings
+from django.urls import reverse
+
+from ..concurrency import run_concurrently
+from ..models import Group, Post
+
+User = get_user_model()
+
+
+@override_settings(FEED_CONCURRENT_QUERIES=True)
+class ConcurrentFeedQueriesTests(TransactionTestCase):
+    def setUp(self):
+        cache.clear()
+        self.author = User.objects.create_user(username='Nameless')
+        self.group = Group.objects.create(
+            title='Test-group', slug='t-group', description='test-description'
+        )
+        for i in range(1, 14):
+            Post.objects.create(text='Тестовый текст ' + str(i),
+                                author=self.author, group=self.group)
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.author)
+
+    def test_calls_run_in_pool_threads(self):
+        names = run_concurrently(
+            lambda: threading.current_thread().name,
+            lambda: threading.current_thread().name,
+        )
+        for name in names:
+            self.assertTrue(name.startswith('feed-query'))
+
+    def test_pool_threads_keep_their_connections(self):
+        wrapper = connections['default'].__class__
+        with mock.patch.object(wrapper, 'close', autospec=True) as close:
+            for _ in range(5):
+                run_concurrently(lambda: Post.objects.count())
+        # при CONN_MAX_AGE = 0 закрытие после вызова означало бы
+        # новое соединение на каждый запрос
+        close.assert_not_called()
+
+    def test_http404_is_propagated(self):
+        def missing():
+            raise Http404
+
+        with self.assertRaises(Http404):
+            run_concurrently(missing, lambda: None)
+
+    def test_feeds_render_with_concurrent_queries(self):
+        response = self.authorized_client.get(
+            reverse('posts:profile', kwargs={'username': 'Nameless'}))
+        self.assertEqual(response.context['author'], self.author)
+        self.assertEqual(len(response.context['page_obj']), 10)
+        self.assertEqual(response.context['author_posts_count'], 13)
+        response = self.authorized_client.get(
+            reverse('posts:group_list', kwargs={'slug': 't-group'}))
+        self.assertEqual(response.context['group'], self.group)
+        self.assertEqual(len(response.context['page_obj']), 10)
+        response = self.authorized_client.get(
+            reverse('posts:group_list', kwargs={'slug': 'no-group'}))
+        self.assertEqual(response.status_code, 404)
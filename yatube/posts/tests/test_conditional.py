@@ -0,0 +1,91 @@
+from datetime import datetime
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, Client
+from django.urls import reverse
+from django.utils.timezone import utc
+
+from ..models import Group, Post
+
+User = get_user_model()
+
+
+class ConditionalPagesTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='Nameless')
+        cls.group = Group.objects.create(
+            title='Test-group', slug='t-group', description='test-description'
+        )
+        cls.post = Post.objects.create(
+            text='Тестовый текст', author=cls.author, group=cls.group,
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.author)
+        self.urls = (
+            reverse('posts:index'),
+            reverse('posts:group_list', kwargs={'slug': 't-group'}),
+            reverse('posts:profile', kwargs={'username': 'Nameless'}),
+            reverse('posts:post_detail', kwargs={'post_id': self.post.pk}),
+        )
+
+    def test_matching_etag_skips_rendering(self):
+        for url in self.urls:
+            with self.subTest(url=url):
+                response = self.authorized_client.get(url)
+                self.assertIn('private', response['Cache-Control'])
+                # сессия, пользователь и один запрос метаданных
+                with self.assertNumQueries(3):
+                    cached = self.authorized_client.get(
+                        url, HTTP_IF_NONE_MATCH=response['ETag'])
+                self.assertEqual(cached.status_code, 304)
+                self.assertIsNone(cached.context)
+
+    def test_anonymous_cached_page_answers_304(self):
+        for url in self.urls[:3]:
+            with self.subTest(url=url):
+                response = self.guest_client.get(url)
+                self.assertIn('public', response['Cache-Control'])
+                with self.assertNumQueries(0):
+                    cached = self.guest_client.get(
+                        url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+                self.assertEqual(cached.status_code, 304)
+
+    def test_etag_differs_between_users(self):
+        url = self.urls[0]
+        etag = self.guest_client.get(url)['ETag']
+        response = self.authorized_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_edit_updates_modified_and_validators(self):
+        url = reverse('posts:post_detail', kwargs={'post_id': self.post.pk})
+        response = self.guest_client.get(url)
+        self.authorized_client.post(
+            reverse('posts:post_edit', kwargs={'post_id': self.post.pk}),
+            data={'text': 'Новый текст', 'group': self.group.pk},
+        )
+        post = Post.objects.get(pk=self.post.pk)
+        self.assertGreater(post.modified, self.post.modified)
+        response = self.guest_client.get(
+            url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'Новый текст')
+
+    def test_delete_moves_feed_last_modified(self):
+        url = self.urls[1]
+        extra = Post.objects.create(text='Лишний', author=self.author,
+                                    group=self.group)
+        Post.objects.update(modified=datetime(2020, 1, 1, tzinfo=utc))
+        cache.clear()
+        response = self.authorized_client.get(url)
+        extra.delete()
+        response = self.authorized_client.get(
+            url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+        self.assertEqual(response.status_code, 200)
+        self.assertNotContains(response, 'Лишний')
@@ -0,0 +1,108 @@
+import base64
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, Client
+from django.urls import reverse
+
+from .. import feed_store
+from ..models import Group, Post
+
+User = get_user_model()
+
+
+@mock.patch.object(feed_store, 'GROUP_FEED_STORE', True)
+@mock.patch.object(feed_store, 'GROUP_FEED_SIZE', 15)
+class GroupFeedStoreTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='Nameless')
+        cls.group = Group.objects.create(
+            title='Test-group', slug='t-group', description='test-description'
+        )
+        cls.other_group = Group.objects.create(
+            title='Other-group', slug='o-group', description='test-description'
+        )
+        for i in range(1, 24):
+            Post.objects.create(text='Тестовый текст ' + str(i),
+                                author=cls.author, group=cls.group)
+
+    def setUp(self):
+        cache.clear()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.author)
+        self.url = reverse('posts:group_list', kwargs={'slug': 't-group'})
+
+    def test_first_page_is_one_id_lookup(self):
+        feed_store.rebuild_feed('t-group')
+        # сессия, пользователь, MAX(modified) для ETag, группа
+        # и пачка постов по id
+        with self.assertNumQueries(5):
+            response = self.authorized_client.get(self.url)
+        self.assertEqual(len(response.context['page_obj']), 10)
+
+    def test_empty_page_from_store(self):
+        feed_store.rebuild_feed('t-group')
+        cursor = base64.urlsafe_b64encode(
+            b'p|2100-01-01T00:00:00+00:00|0').decode()
+        response = self.authorized_client.get(self.url + '?cursor=' + cursor)
+        self.assertEqual(response.status_code, 200)
+        page_obj = response.context['page_obj']
+        self.assertEqual(len(page_obj), 0)
+        self.assertFalse(page_obj.has_next())
+        self.assertFalse(page_obj.has_previous())
+
+    def test_cursor_walk_crosses_store_boundary(self):
+        expected = list(self.group.posts.order_by('-pub_date', '-pk'))
+        page_obj = self.authorized_client.get(self.url).context['page_obj']
+        seen = list(page_obj)
+        while page_obj.has_next():
+            page_obj = self.authorized_client.get(
+                self.url + '?cursor=' + page_obj.next_cursor
+            ).context['page_obj']
+            seen.extend(page_obj)
+        self.assertEqual(seen, expected)
+
+    def test_previous_cursor_from_store(self):
+        first = self.authorized_client.get(self.url).context['page_obj']
+        second = self.authorized_client.get(
+            self.url + '?cursor=' + first.next_cursor).context['page_obj']
+        back = self.authorized_client.get(
+            self.url + '?cursor=' + second.previous_cursor
+        ).context['page_obj']
+        self.assertEqual(list(back), list(first))
+        self.assertFalse(back.has_previous())
+
+    def test_create_edit_and_delete_update_store(self):
+        feed_store.rebuild_feed('t-group')
+        feed_store.rebuild_feed('o-group')
+        self.authorized_client.post(
+            reverse('posts:post_create'),
+            data={'text': 'Свежий пост', 'group': self.group.pk},
+        )
+        post = Post.objects.get(text='Свежий пост')
+        self.assertEqual(feed_store.load_feed('t-group')['entries'][0][1],
+                         post.pk)
+
+        self.authorized_client.post(
+            reverse('posts:post_edit', kwargs={'post_id': post.pk}),
+            data={'text': 'Свежий пост', 'group': self.other_group.pk},
+        )
+        self.assertNotIn(post.pk, [
+            pk for _, pk in feed_store.load_feed('t-group')['entries']])
+        self.assertEqual(
+            [pk for _, pk in feed_store.load_feed('o-group')['entries']],
+            [post.pk])
+
+        Post.objects.get(pk=post.pk).delete()
+        self.assertEqual(feed_store.load_feed('o-group')['entries'], [])
+
+    def test_slug_change_drops_old_feed(self):
+        group = Group.objects.create(title='Renamed', slug='old-slug')
+        feed_store.rebuild_feed('old-slug')
+        self.assertIsNotNone(cache.get(feed_store.feed_key('old-slug')))
+        group.slug = 'new-slug'
+        group.save()
+        self.assertIsNone(cache.get(feed_store.feed_key('old-slug')))
@@ -1,4 +1,5 @@
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
 from django.test import TestCase, Client
 from django.urls import reverse
 from django import forms
@@ -50,3 +51,84 @@ class PostFormTests(TestCase):
         )
         new_post = Post.objects.get(id=1)
         self.assertNotEqual(old_post.text, new_post.text)
+
+
+class PostEditQueriesTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='Nameless')
+        cls.group = Group.objects.create(
+            title='Test-group', slug='t-group', description='test-description'
+        )
+        cls.post = Post.objects.create(
+            text='Тестовый заголовок',
+            author=cls.author,
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.author)
+        self.url = reverse('posts:post_edit', kwargs={'post_id': self.post.pk})
+
+    def test_edit_page_reads_groups_from_cache(self):
+        self.authorized_client.get(self.url)
+        # сессия, пользователь и пост вместе с автором
+        with self.assertNumQueries(3):
+            response = self.authorized_client.get(self.url)
+        self.assertContains(response, 'Test-group')
+
+    def test_edit_post_queries(self):
+        # сессия, пользователь, пост с автором, группа из поля формы
+        # и её проверка в full_clean, UPDATE, slug групп для сброса лент
+        # и запись в поисковый индекс
+        with self.assertNumQueries(8):
+            self.authorized_client.post(
+                self.url, data={'text': 'Новый текст', 'group': self.group.pk}
+            )
+        self.assertEqual(Post.objects.get(pk=self.post.pk).group, self.group)
+
+    def test_group_choices_follow_group_changes(self):
+        self.authorized_client.get(self.url)
+        Group.objects.create(
+            title='Other-group', slug='o-group', description='test-description'
+        )
+        self.assertContains(self.authorized_client.get(self.url),
+                            'Other-group')
+
+
+class GroupAutocompleteTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='Nameless')
+        for i, title in enumerate(('Котики', 'Кофе', 'Собаки', 'коллекции')):
+            Group.objects.create(title=title, slug=f'group-{i}',
+                                 description='test-description')
+        cls.post = Post.objects.create(
+            text='Тестовый заголовок',
+            author=cls.author,
+            group=Group.objects.get(title='Собаки'),
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.author)
+
+    def test_autocomplete_finds_groups_by_prefix(self):
+        response = self.authorized_client.get(
+            reverse('posts:group_autocomplete'), {'q': 'ко'})
+        titles = [group['title'] for group in response.json()['results']]
+        self.assertEqual(titles, ['Котики', 'Кофе', 'коллекции'])
+
+    def test_autocomplete_form_renders_only_selected_group(self):
+        with self.settings(POST_FORM_GROUP_AUTOCOMPLETE=True):
+            response = self.authorized_client.get(reverse(
+                'posts:post_edit', kwargs={'post_id': self.post.pk}))
+        self.assertContains(response, 'data-autocomplete-url')
+        self.assertContains(response, 'Собаки')
+        self.assertNotContains(response, 'Котики')
+        self.assertIsInstance(response.context['form'].fields['group'],
+                              forms.ModelChoiceField)
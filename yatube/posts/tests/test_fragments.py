@@ -0,0 +1,55 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, Client
+from django.urls import reverse
+
+from .. import fragments
+from ..models import Post
+
+User = get_user_model()
+
+
+class PostCardCacheTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='Nameless')
+        cls.post = Post.objects.create(
+            text='Тестовый текст',
+            author=cls.author,
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.author)
+
+    def test_card_is_reused_between_requests(self):
+        before = fragments.card_cache_stats()
+        self.authorized_client.get(reverse('posts:index'))
+        self.authorized_client.get(reverse('posts:index'))
+        after = fragments.card_cache_stats()
+        self.assertEqual(after['misses'] - before['misses'], 1)
+        self.assertEqual(after['hits'] - before['hits'], 1)
+
+    def test_edit_bumps_card_version(self):
+        self.guest_client.get(reverse('posts:index'))
+        self.authorized_client.post(
+            reverse('posts:post_edit', kwargs={'post_id': self.post.pk}),
+            data={'text': 'Новый тестовый текст'},
+        )
+        response = self.guest_client.get(reverse('posts:index'))
+        self.assertContains(response, 'Новый тестовый текст')
+
+    def test_author_rename_changes_card(self):
+        self.authorized_client.get(reverse('posts:index'))
+        self.author.first_name = 'Новое'
+        self.author.last_name = 'Имя'
+        self.author.save()
+        response = self.authorized_client.get(reverse('posts:index'))
+        self.assertContains(response, 'Новое Имя')
+
+    def test_metrics_are_exposed(self):
+        response = self.guest_client.get(reverse('posts:card_cache_metrics'))
+        self.assertContains(response, 'yatube_post_card_cache_total')
@@ -1,7 +1,13 @@
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 
-from ..models import Group, Post
+from ..models import AuthorStats, Group, Post
+from ..page_cache import feed_version_key
+from ..search import search_posts
+from ..signals import deleting_authors
 
 User = get_user_model()
 
@@ -55,3 +61,62 @@ class PostModelTest(TestCase):
             with self.subTest(field=field):
                 self.assertEqual(
                     post._meta.get_field(field).help_text, expected_value)
+
+
+class AuthorStatsTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+
+    def test_posts_count_follows_create_and_delete(self):
+        posts = [
+            Post.objects.create(author=self.user, text='Тестовый пост')
+            for _ in range(3)
+        ]
+        stats = AuthorStats.objects.get(author=self.user)
+        self.assertEqual(stats.posts_count, 3)
+        posts[0].delete()
+        stats.refresh_from_db()
+        self.assertEqual(stats.posts_count, 2)
+
+
+class AuthorDeleteTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание',
+        )
+        cls.reader = User.objects.create_user(username='reader')
+        Post.objects.create(author=cls.reader, text='Чужой пост',
+                            group=cls.group)
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='auth')
+        for _ in range(30):
+            Post.objects.create(author=self.user, text='Удаляемый пост',
+                                group=self.group)
+
+    def test_cascade_skips_per_post_work(self):
+        versions = [feed_version_key('index'),
+                    feed_version_key('profile', 'auth'),
+                    feed_version_key('group_posts', 'test-slug')]
+        before = cache.get_many(versions)
+        with CaptureQueriesContext(connection) as queries:
+            self.user.delete()
+        # без пропуска каскад стоил несколько запросов на каждый пост
+        self.assertLess(len(queries), 20)
+        self.assertEqual(deleting_authors(), {})
+        self.assertNotEqual(cache.get_many(versions), before)
+        self.assertEqual(search_posts('удаляемый').count(), 0)
+        self.assertEqual(search_posts('чужой').count(), 1)
+
+    def test_other_deletes_still_count(self):
+        self.user.delete()
+        Post.objects.get(author=self.reader).delete()
+        self.assertEqual(
+            AuthorStats.objects.get(author=self.reader).posts_count, 0)
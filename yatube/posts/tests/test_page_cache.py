@@ -0,0 +1,106 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import transaction
+from django.test import Client, SimpleTestCase, TestCase, TransactionTestCase
+from django.urls import reverse
+
+from ..models import Group, Post
+from ..page_cache import feed_page_key, feed_version_key, invalidate_feed
+
+User = get_user_model()
+
+
+class AnonymousFeedCacheTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='Nameless')
+        cls.group = Group.objects.create(
+            title='Test-group', slug='t-group', description='test-description'
+        )
+        cls.other_group = Group.objects.create(
+            title='Other-group', slug='o-group', description='test-description'
+        )
+        cls.post = Post.objects.create(
+            text='Тестовый текст',
+            author=cls.author,
+            group=cls.group,
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.author)
+
+    def test_anonymous_page_is_served_from_cache(self):
+        url = reverse('posts:index')
+        self.guest_client.get(url)
+        with self.assertNumQueries(0):
+            response = self.guest_client.get(url)
+        self.assertContains(response, 'Тестовый текст')
+
+    def test_authorized_page_is_not_cached(self):
+        url = reverse('posts:index')
+        self.authorized_client.get(url)
+        response = self.authorized_client.get(url)
+        self.assertIsNotNone(response.context)
+
+    def test_create_invalidates_only_affected_feeds(self):
+        urls = {
+            'index': reverse('posts:index'),
+            'group': reverse('posts:group_list', kwargs={'slug': 't-group'}),
+            'other_group': reverse('posts:group_list',
+                                   kwargs={'slug': 'o-group'}),
+            'profile': reverse('posts:profile',
+                               kwargs={'username': 'Nameless'}),
+        }
+        for url in urls.values():
+            self.guest_client.get(url)
+        self.authorized_client.post(
+            reverse('posts:post_create'),
+            data={'text': 'Свежий пост', 'group': self.group.pk},
+        )
+        for name in ('index', 'group', 'profile'):
+            with self.subTest(feed=name):
+                response = self.guest_client.get(urls[name])
+                self.assertContains(response, 'Свежий пост')
+        with self.assertNumQueries(0):
+            self.guest_client.get(urls['other_group'])
+
+    def test_group_change_invalidates_old_and_new_group(self):
+        old_url = reverse('posts:group_list', kwargs={'slug': 't-group'})
+        new_url = reverse('posts:group_list', kwargs={'slug': 'o-group'})
+        self.guest_client.get(old_url)
+        self.guest_client.get(new_url)
+        self.authorized_client.post(
+            reverse('posts:post_edit', kwargs={'post_id': self.post.pk}),
+            data={'text': 'Тестовый текст', 'group': self.other_group.pk},
+        )
+        self.assertNotContains(self.guest_client.get(old_url),
+                               'Тестовый текст')
+        self.assertContains(self.guest_client.get(new_url), 'Тестовый текст')
+
+
+class FeedVersionTests(TransactionTestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_version_is_bumped_again_after_commit(self):
+        key = feed_version_key('index')
+        with transaction.atomic():
+            invalidate_feed('index')
+            # страница, закешированная до коммита, ляжет под эту версию
+            inside = cache.get(key)
+        self.assertEqual(cache.get(key), inside + 1)
+
+
+class FeedKeyTests(SimpleTestCase):
+    def test_non_ascii_argument_is_encoded(self):
+        for key in (feed_version_key('profile', 'Иван Петров'),
+                    feed_page_key('profile', 'Иван Петров', 1, 'page=2'),
+                    feed_version_key('profile', 'ж' * 150)):
+            with self.subTest(key=key):
+                self.assertTrue(key.isascii())
+                self.assertNotIn(' ', key)
+                self.assertLess(len(key), 250)
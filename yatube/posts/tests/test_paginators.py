@@ -0,0 +1,110 @@
+import base64
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, Client
+from django.urls import reverse
+
+from ..models import Post
+from ..paginators import (
+    NEXT, PREVIOUS, CursorPaginator, decode_cursor, encode_cursor,
+)
+
+User = get_user_model()
+
+# курсоры, за которыми нет ни одной записи
+EMPTY_CURSORS = [
+    base64.urlsafe_b64encode(raw.encode()).decode()
+    for raw in ('n|1970-01-01T00:00:00+00:00|0',
+                'p|2100-01-01T00:00:00+00:00|0')
+]
+
+
+class CursorPaginatorTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='Nameless')
+        for i in range(1, 24):
+            Post.objects.create(
+                text='Тестовый текст ' + str(i),
+                author=cls.author,
+            )
+        cls.guest_client = Client()
+
+    def setUp(self):
+        cache.clear()
+
+    def test_cursor_pages_walk_whole_feed(self):
+        """Курсоры проходят ленту без пропусков и повторов."""
+        expected = list(Post.objects.order_by('-pub_date', '-pk'))
+        response = self.guest_client.get(reverse('posts:index'))
+        page_obj = response.context['page_obj']
+        seen = list(page_obj)
+        self.assertFalse(page_obj.has_previous())
+        while page_obj.has_next():
+            response = self.guest_client.get(
+                reverse('posts:index') + '?cursor=' + page_obj.next_cursor
+            )
+            page_obj = response.context['page_obj']
+            seen.extend(page_obj)
+        self.assertEqual(seen, expected)
+        self.assertEqual(len(page_obj), 3)
+
+    def test_previous_cursor_returns_same_page(self):
+        url = reverse('posts:index')
+        first = self.guest_client.get(url).context['page_obj']
+        second = self.guest_client.get(
+            url + '?cursor=' + first.next_cursor).context['page_obj']
+        back = self.guest_client.get(
+            url + '?cursor=' + second.previous_cursor).context['page_obj']
+        self.assertEqual(list(back), list(first))
+        self.assertFalse(back.has_previous())
+        self.assertTrue(back.has_next())
+
+    def test_cursor_page_skips_offset_and_count(self):
+        url = reverse('posts:profile', kwargs={'username': 'Nameless'})
+        first = self.guest_client.get(url).context['page_obj']
+        with self.assertNumQueries(3):
+            # MAX(modified) для ETag, автор вместе со счётчиком постов
+            # и страница постов
+            self.guest_client.get(url + '?cursor=' + first.next_cursor)
+
+    def test_broken_cursor_falls_back_to_first_page(self):
+        self.assertIsNone(decode_cursor('not-a-cursor'))
+        response = self.guest_client.get(
+            reverse('posts:index') + '?cursor=not-a-cursor')
+        page_obj = response.context['page_obj']
+        self.assertEqual(len(page_obj), 10)
+        self.assertFalse(page_obj.has_previous())
+
+    def test_empty_cursor_page_has_no_links(self):
+        for cursor in EMPTY_CURSORS:
+            with self.subTest(cursor=cursor):
+                response = self.guest_client.get(
+                    reverse('posts:index') + '?cursor=' + cursor)
+                self.assertEqual(response.status_code, 200)
+                page_obj = response.context['page_obj']
+                self.assertEqual(len(page_obj), 0)
+                self.assertFalse(page_obj.has_next())
+                self.assertFalse(page_obj.has_previous())
+                self.assertIsNone(page_obj.next_cursor)
+                self.assertIsNone(page_obj.previous_cursor)
+
+                response = self.guest_client.get(
+                    reverse('posts:api_index') + '?cursor=' + cursor)
+                self.assertEqual(response.json(), {
+                    'results': [], 'next': None, 'previous': None,
+                })
+
+    def test_cursor_page_seeks_by_index(self):
+        """Страница по курсору ищет границу в индексе, а не обходит его."""
+        newest = Post.objects.order_by('-pub_date', '-pk').first()
+        paginator = CursorPaginator(Post.objects.all(), 10)
+        for direction in (NEXT, PREVIOUS):
+            with self.subTest(direction=direction):
+                plan = paginator.page_queryset(
+                    encode_cursor(direction, newest)).explain()
+                self.assertIn('SEARCH', plan)
+                self.assertIn('post_pub_date_idx', plan)
+                self.assertNotIn('SCAN posts_post', plan)
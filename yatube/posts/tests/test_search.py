@@ -0,0 +1,63 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, Client
+from django.urls import reverse
+
+from ..models import Post
+from ..search import Fts5SearchBackend, InvertedIndexBackend, search_posts
+
+User = get_user_model()
+
+
+class PostSearchTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='Nameless')
+        cls.cat_post = Post.objects.create(
+            text='Кот спит. Кот ест. Кот гуляет.', author=cls.author)
+        cls.dog_post = Post.objects.create(
+            text='Собака и кот дружат', author=cls.author)
+        Post.objects.create(text='Про погоду', author=cls.author)
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+
+    def check_backend(self, backend):
+        self.assertEqual(backend.count('кот'), 2)
+        self.assertEqual(
+            backend.ranked_ids('кот', 0, 10),
+            [self.cat_post.pk, self.dog_post.pk]
+        )
+        self.assertEqual(backend.ranked_ids('кот собака', 0, 10),
+                         [self.dog_post.pk])
+        self.assertEqual(backend.count('"OR *'), 0)
+
+    def test_fts5_backend(self):
+        self.check_backend(Fts5SearchBackend())
+
+    def test_python_backend(self):
+        self.check_backend(InvertedIndexBackend())
+
+    def test_index_follows_edit_and_delete(self):
+        dog_post = Post.objects.get(pk=self.dog_post.pk)
+        dog_post.text = 'Собака одна'
+        dog_post.save()
+        self.assertEqual(search_posts('кот').count(), 1)
+        Post.objects.get(pk=self.cat_post.pk).delete()
+        self.assertEqual(search_posts('кот').count(), 0)
+
+    def test_search_page(self):
+        response = self.guest_client.get(
+            reverse('posts:search'), {'q': 'собака'})
+        self.assertEqual(list(response.context['page_obj']), [self.dog_post])
+
+    def test_search_api(self):
+        response = self.guest_client.get(
+            reverse('posts:search_api'), {'q': 'кот'})
+        data = response.json()
+        self.assertEqual(data['count'], 2)
+        self.assertEqual(data['results'][0]['id'], self.cat_post.pk)
+        response = self.guest_client.get(reverse('posts:search_api'))
+        self.assertEqual(response.status_code, 400)
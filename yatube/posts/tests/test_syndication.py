@@ -0,0 +1,98 @@
+from unittest import mock
+from xml.etree import ElementTree
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, Client
+from django.urls import reverse
+
+from .. import syndication
+from ..models import Group, Post
+
+User = get_user_model()
+
+ATOM = '{http://www.w3.org/2005/Atom}'
+SITEMAP = '{http://www.sitemaps.org/schemas/sitemap/0.9}'
+
+
+class SyndicationTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='Nameless')
+        cls.group = Group.objects.create(
+            title='Test-group', slug='t-group', description='test-description'
+        )
+        for i in range(1, 6):
+            Post.objects.create(text=f'Тестовый текст {i} <b>',
+                                author=cls.author, group=cls.group)
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+
+    def get_xml(self, url, **headers):
+        response = self.guest_client.get(url, **headers)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        return response, ElementTree.fromstring(
+            b''.join(response.streaming_content))
+
+    @mock.patch.object(syndication, 'SITEMAP_SHARD_SIZE', 2)
+    def test_sitemap_index_lists_shards_covering_all_posts(self):
+        _, index = self.get_xml(reverse('posts:sitemap'))
+        shards = [loc.text for loc in index.iter(SITEMAP + 'loc')]
+        locs = []
+        for shard in shards:
+            _, urlset = self.get_xml(shard)
+            locs.extend(loc.text for loc in urlset.iter(SITEMAP + 'loc'))
+        for post in Post.objects.all():
+            self.assertIn('http://testserver' + reverse(
+                'posts:post_detail', kwargs={'post_id': post.pk}), locs)
+        self.assertIn('http://testserver/group/t-group/', locs)
+        self.assertIn('http://testserver/profile/Nameless/', locs)
+
+    def test_atom_feeds_contain_newest_posts(self):
+        urls = (
+            reverse('posts:group_feed', kwargs={'slug': 't-group'}),
+            reverse('posts:author_feed', kwargs={'username': 'Nameless'}),
+        )
+        newest = Post.objects.order_by('-pub_date', '-pk').first()
+        for url in urls:
+            with self.subTest(url=url):
+                response, feed = self.get_xml(url)
+                self.assertIn('atom', response['Content-Type'])
+                entries = feed.findall(ATOM + 'entry')
+                self.assertEqual(len(entries), 5)
+                self.assertEqual(entries[0].find(ATOM + 'content').text,
+                                 newest.text)
+
+    def test_feed_is_cached_until_posts_change(self):
+        url = reverse('posts:group_feed', kwargs={'slug': 't-group'})
+        response, _ = self.get_xml(url)
+        with self.assertNumQueries(1):
+            # только MAX(modified) для валидаторов, тело из кеша
+            self.get_xml(url)
+        not_modified = self.guest_client.get(
+            url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(not_modified.status_code, 304)
+
+        Post.objects.create(text='Свежий пост', author=self.author,
+                            group=self.group)
+        _, feed = self.get_xml(url)
+        self.assertEqual(
+            feed.find(ATOM + 'entry').find(ATOM + 'content').text,
+            'Свежий пост')
+
+    def test_missing_feed_owner_returns_404(self):
+        urls = (
+            reverse('posts:group_feed', kwargs={'slug': 'missing'}),
+            reverse('posts:author_feed', kwargs={'username': 'missing'}),
+            reverse('posts:sitemap_section',
+                    kwargs={'section': 'missing', 'shard': 0}),
+            reverse('posts:sitemap_section',
+                    kwargs={'section': 'posts', 'shard': 999}),
+        )
+        for url in urls:
+            with self.subTest(url=url):
+                self.assertEqual(self.guest_client.get(url).status_code, 404)
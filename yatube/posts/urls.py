@@ -1,6 +1,6 @@
 from django.urls import path
 
-from . import views
+from . import api, syndication, views
 
 app_name = 'posts'
 
@@ -10,5 +10,23 @@ urlpatterns = [
     path('profile/<str:username>/', views.profile, name='profile'),
     path('posts/<int:post_id>/', views.post_detail, name='post_detail'),
     path('create/', views.post_create, name='post_create'),
+    path('search/', views.search, name='search'),
+    path('api/search/', views.search_api, name='search_api'),
+    path('api/groups/', views.group_autocomplete,
+         name='group_autocomplete'),
+    path('api/posts/', api.index_api, name='api_index'),
+    path('api/posts/<int:post_id>/', api.post_detail_api,
+         name='api_post_detail'),
+    path('api/group/<slug:slug>/', api.group_api, name='api_group_list'),
+    path('api/profile/<str:username>/', api.profile_api, name='api_profile'),
     path('posts/<post_id>/edit/', views.post_edit, name='post_edit'),
+    path('group/<slug:slug>/feed/', syndication.group_feed,
+         name='group_feed'),
+    path('profile/<str:username>/feed/', syndication.author_feed,
+         name='author_feed'),
+    path('sitemap.xml', syndication.sitemap, name='sitemap'),
+    path('sitemap-<slug:section>-<int:shard>.xml',
+         syndication.sitemap_section, name='sitemap_section'),
+    path('metrics/post-cards/', views.card_cache_metrics,
+         name='card_cache_metrics'),
 ]
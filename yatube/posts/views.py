@@ -1,29 +1,96 @@
+from functools import partial
+from typing import Optional
+
 from django.contrib.auth.decorators import login_required
 from django.core.paginator import Paginator, Page
+from django.db import transaction
 from django.db.models import QuerySet
+from django.http import HttpResponse, JsonResponse
 from django.shortcuts import render, get_object_or_404, redirect
 
+from . import feed_store, fragments
+from .concurrency import run_concurrently
+from .conditional import cache_headers, feed_condition, post_condition
 from .forms import PostForm
-from .models import Group, Post, User
+from .group_choices import find_groups
+from .models import AuthorStats, Group, Post, User
+from .page_cache import cache_anonymous_feed
+from .search import search_posts
+from .paginators import CursorPaginator
 
 MAX_POST_DISPLAYED: int = 10
 
 
 def get_page(page_number: int,
              post_list: QuerySet,
-             max_displayed_posts: int = MAX_POST_DISPLAYED) -> Page:
+             max_displayed_posts: int = MAX_POST_DISPLAYED,
+             count: Optional[int] = None) -> Page:
     paginator = Paginator(post_list, max_displayed_posts)
+    if count is not None:
+        paginator.count = count
     page_posts = paginator.get_page(page_number)
     return page_posts
 
 
+def get_cursor_page(cursor: str,
+                    post_list: QuerySet,
+                    max_displayed_posts: int = MAX_POST_DISPLAYED) -> Page:
+    paginator = CursorPaginator(post_list, max_displayed_posts)
+    return paginator.get_page(cursor)
+
+
+def get_feed_page(request,
+                  post_list: QuerySet,
+                  max_displayed_posts: int = MAX_POST_DISPLAYED,
+                  count: Optional[int] = None) -> Page:
+    """Номерная страница для ?page=N, иначе keyset-страница по курсору."""
+    page_number = request.GET.get('page')
+    if page_number is not None:
+        return get_page(page_number, post_list, max_displayed_posts, count)
+    return get_cursor_page(
+        request.GET.get('cursor'), post_list, max_displayed_posts
+    )
+
+
+def get_group_cursor_page(slug: str, cursor: Optional[str],
+                          post_list: QuerySet) -> Page:
+    """Первые страницы группы из feed_store, остальные из базы."""
+    if feed_store.GROUP_FEED_STORE:
+        page_obj = feed_store.get_group_page(
+            slug, cursor, post_list, MAX_POST_DISPLAYED
+        )
+        if page_obj is not None:
+            return page_obj
+    return get_cursor_page(cursor, post_list)
+
+
+def get_group_feed_page(request, slug: str, post_list: QuerySet) -> Page:
+    if 'page' in request.GET:
+        return get_feed_page(request, post_list)
+    return get_group_cursor_page(slug, request.GET.get('cursor'), post_list)
+
+
+def get_posts_count(author: User) -> int:
+    """Счётчик постов из AuthorStats; строку без счётчика создаёт сразу."""
+    try:
+        return author.stats.posts_count
+    except AuthorStats.DoesNotExist:
+        stats, _ = AuthorStats.objects.get_or_create(
+            author=author,
+            defaults={'posts_count': author.posts.count()},
+        )
+        return stats.posts_count
+
+
+@cache_headers
+@cache_anonymous_feed('index')
+@feed_condition('html', 'index', per_user=True)
 def index(request):
     post_list = Post.objects.select_related(
         'author',
         'group'
     )
-    page_number = request.GET.get('page')
-    page_obj = get_page(page_number, post_list)
+    page_obj = get_feed_page(request, post_list)
 
     title = 'Последние обновления на сайте'
     template = 'posts/index.html'
@@ -36,11 +103,16 @@ def index(request):
     return render(request, template, context)
 
 
+@cache_headers
+@cache_anonymous_feed('group_posts', 'slug')
+@feed_condition('html', 'group_posts', 'slug', 'group__slug',
+                per_user=True)
 def group_posts(request, slug):
-    group = get_object_or_404(Group, slug=slug)
-    post_list = group.posts.select_related('author')
-    page_number = request.GET.get('page')
-    page_obj = get_page(page_number, post_list)
+    post_list = Post.objects.filter(group__slug=slug).select_related('author')
+    group, page_obj = run_concurrently(
+        partial(get_object_or_404, Group, slug=slug),
+        partial(get_group_feed_page, request, slug, post_list),
+    )
 
     title = f'Записи сообщества {group.title}'
     template = 'posts/group_list.html'
@@ -53,17 +125,32 @@ def group_posts(request, slug):
     return render(request, template, context)
 
 
+@cache_headers
+@cache_anonymous_feed('profile', 'username')
+@feed_condition('html', 'profile', 'username', 'author__username',
+                per_user=True)
 def profile(request, username):
-    author = get_object_or_404(User, username=username)
-    post_list = author.posts.all()
-    page_number = request.GET.get('page')
-    page_obj = get_page(page_number, post_list)
+    authors = User.objects.select_related('stats')
+    if 'page' in request.GET:
+        # номерной странице нужен счётчик автора, поэтому запросы по очереди
+        author = get_object_or_404(authors, username=username)
+        author_posts_count = get_posts_count(author)
+        post_list = author.posts.select_related('group')
+        page_obj = get_page(request.GET['page'], post_list,
+                            count=author_posts_count)
+    else:
+        post_list = Post.objects.filter(
+            author__username=username
+        ).select_related('author', 'group')
+        author, page_obj = run_concurrently(
+            partial(get_object_or_404, authors, username=username),
+            partial(get_cursor_page, request.GET.get('cursor'), post_list),
+        )
+        author_posts_count = get_posts_count(author)
 
     title = f'Все посты пользователя {author.username}'
     template = 'posts/profile.html'
 
-    author_posts_count = author.posts.count()
-
     context = {
         'author': author,
         'page_obj': page_obj,
@@ -73,9 +160,14 @@ def profile(request, username):
     return render(request, template, context)
 
 
+@cache_headers
+@post_condition('html', per_user=True)
 def post_detail(request, post_id):
-    full_post = get_object_or_404(Post, pk=post_id)
-    author_posts_count = full_post.author.posts.count()
+    full_post = get_object_or_404(
+        Post.objects.select_related('author', 'author__stats', 'group'),
+        pk=post_id
+    )
+    author_posts_count = get_posts_count(full_post.author)
 
     title = full_post.text
     template = 'posts/post_detail.html'
@@ -87,6 +179,52 @@ def post_detail(request, post_id):
     return render(request, template, context)
 
 
+def search(request):
+    query = request.GET.get('q', '').strip()
+    page_obj = None
+    if query:
+        page_obj = get_page(request.GET.get('page'), search_posts(query))
+
+    title = f'Поиск: {query}' if query else 'Поиск'
+    template = 'posts/search.html'
+    context = {
+        'page_obj': page_obj,
+        'query': query,
+        'title': title,
+    }
+    return render(request, template, context)
+
+
+def search_api(request):
+    query = request.GET.get('q', '').strip()
+    if not query:
+        return JsonResponse({'error': 'Пустой запрос'}, status=400)
+    page_obj = get_page(request.GET.get('page'), search_posts(query))
+    results = [
+        {
+            'id': post.pk,
+            'text': post.text,
+            'author': post.author.username,
+            'group': post.group.slug if post.group else None,
+            'pub_date': post.pub_date.isoformat(),
+        }
+        for post in page_obj
+    ]
+    return JsonResponse({
+        'query': query,
+        'count': page_obj.paginator.count,
+        'page': page_obj.number,
+        'num_pages': page_obj.paginator.num_pages,
+        'results': results,
+    })
+
+
+@login_required
+def group_autocomplete(request):
+    groups = find_groups(request.GET.get('q', ''))
+    return JsonResponse({'results': groups})
+
+
 @login_required
 def post_create(request):
     if request.method == 'POST':
@@ -94,7 +232,8 @@ def post_create(request):
         if form.is_valid():
             form = form.save(commit=False)
             form.author = request.user
-            form.save()
+            with transaction.atomic():
+                form.save()
             return redirect('posts:profile', request.user)
 
     form = PostForm()
@@ -108,19 +247,26 @@ def post_create(request):
 
 @login_required
 def post_edit(request, post_id):
-    post = get_object_or_404(Post, pk=post_id)
-    form = PostForm(request.POST or None, instance=post)
-
-    if post.author != request.user:
+    # автор нужен и для проверки, и сигналам после сохранения
+    post = get_object_or_404(Post.objects.select_related('author'),
+                             pk=post_id)
+    if post.author_id != request.user.pk:
         return redirect('posts:post_detail', post_id=post_id)
 
-    if request.method == 'POST':
-        form = PostForm(request.POST, instance=post)
-        if form.is_valid():
-            post.save()
-            return redirect('posts:post_detail', post.pk)
+    post._old_group_id = post.group_id
+    form = PostForm(request.POST or None, instance=post)
+    if request.method == 'POST' and form.is_valid():
+        form.save()
+        return redirect('posts:post_detail', post.pk)
 
     template = 'posts/create_post.html'
     is_edit = True
     context = {'form': form, 'is_edit': is_edit}
     return render(request, template, context)
+
+
+def card_cache_metrics(request):
+    return HttpResponse(
+        fragments.card_cache_metrics(),
+        content_type='text/plain; version=0.0.4'
+    )
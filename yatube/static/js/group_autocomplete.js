@@ -0,0 +1,32 @@
+// Автодополнение группы: поле поиска над select, варианты с сервера.
+document.querySelectorAll('select[data-autocomplete-url]').forEach(function (select) {
+  var input = document.createElement('input');
+  input.type = 'search';
+  input.className = 'form-control mb-2';
+  input.placeholder = 'Начните вводить название группы';
+  select.parentNode.insertBefore(input, select);
+
+  var timer = null;
+  input.addEventListener('input', function () {
+    clearTimeout(timer);
+    timer = setTimeout(function () {
+      var url = select.dataset.autocompleteUrl + '?q=' + encodeURIComponent(input.value);
+      fetch(url, {credentials: 'same-origin'})
+        .then(function (response) { return response.json(); })
+        .then(function (data) {
+          var selected = select.value;
+          // выбранную группу оставляем, даже если её нет в выдаче
+          for (var i = select.options.length - 1; i > 0; i--) {
+            if (!select.options[i].selected) {
+              select.remove(i);
+            }
+          }
+          data.results.forEach(function (group) {
+            if (String(group.pk) !== selected) {
+              select.add(new Option(group.title, group.pk));
+            }
+          });
+        });
+    }, 200);
+  });
+});
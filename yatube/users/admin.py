@@ -1,3 +1,14 @@
+from django.contrib import admin
 
+from .models import QueuedEmail
 
-# Register your models here.
+
+class QueuedEmailAdmin(admin.ModelAdmin):
+    list_display = ('pk', 'created', 'attempts', 'next_attempt_at',
+                    'sent_at', 'last_error')
+    list_filter = ('sent_at',)
+    exclude = ('payload',)
+    empty_value_display = '-пусто-'
+
+
+admin.site.register(QueuedEmail, QueuedEmailAdmin)
@@ -0,0 +1,141 @@
+import csv
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterable, List, Optional
+
+import django
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.password_validation import validate_password
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
+from django.db import IntegrityError, transaction
+
+from posts.bulk import batched
+
+User = get_user_model()
+
+FIELDS = ('username', 'email', 'first_name', 'last_name', 'password')
+
+
+def signup_setting(name: str, default):
+    return getattr(settings, f'SIGNUP_{name}', default)
+
+
+class BulkSignup:
+    """Создаёт аккаунты пачками из строк CSV.
+
+    На пачку — один запрос занятых имён, хеши паролей в пуле процессов
+    и один bulk_create. Ошибочные строки и занятые имена пропускаются
+    и попадают в отчёт, остальные создаются.
+    """
+
+    def __init__(self, batch_size: Optional[int] = None,
+                 processes: Optional[int] = None):
+        self.batch_size = batch_size or signup_setting('BATCH_SIZE', 500)
+        if processes is None:
+            processes = signup_setting('HASHING_PROCESSES', 0)
+        self.processes = processes
+        self.created = 0
+        self.skipped: List[str] = []
+        self.errors: List[dict] = []
+        self._seen = set()
+
+    def report(self) -> dict:
+        return {
+            'created': self.created,
+            'skipped': self.skipped,
+            'errors': self.errors,
+        }
+
+    def run(self, lines: Iterable[str]) -> dict:
+        rows = csv.DictReader(lines)
+        missing = {'username'} - set(rows.fieldnames or ())
+        if missing:
+            self.errors.append({'line': 1, 'error': 'Нет колонки username'})
+            return self.report()
+
+        pool = (ProcessPoolExecutor(self.processes, initializer=django.setup)
+                if self.processes else None)
+        try:
+            valid = (user for user in (
+                self.build_user(line, row)
+                for line, row in enumerate(rows, start=2)
+            ) if user is not None)
+            for batch in batched(valid, self.batch_size):
+                self.create_batch(batch, pool)
+        finally:
+            if pool is not None:
+                pool.shutdown()
+        return self.report()
+
+    def build_user(self, line: int, row: dict) -> Optional[User]:
+        values = {field: (row.get(field) or '').strip() for field in FIELDS}
+        username = User.normalize_username(values['username'])
+        user = User(
+            username=username,
+            email=User.objects.normalize_email(values['email']),
+            first_name=values['first_name'],
+            last_name=values['last_name'],
+        )
+        try:
+            user.clean_fields(exclude=('password',))
+            if user.email:
+                validate_email(user.email)
+            if values['password']:
+                validate_password(values['password'], user)
+        except ValidationError as error:
+            self.errors.append({'line': line, 'username': username,
+                                'error': ' '.join(error.messages)})
+            return None
+        if username in self._seen:
+            self.skipped.append(username)
+            return None
+        self._seen.add(username)
+        # пароль до хеширования; без пароля аккаунт без входа по паролю
+        user.password = values['password'] or None
+        user._import_line = line
+        return user
+
+    def create_batch(self, batch: List[User], pool) -> None:
+        batch = self.drop_taken(batch)
+        if not batch:
+            return
+
+        passwords = [user.password for user in batch]
+        if pool is None:
+            hashes = [make_password(password) for password in passwords]
+        else:
+            chunksize = max(1, len(passwords) // (self.processes * 4))
+            hashes = pool.map(make_password, passwords, chunksize=chunksize)
+        for user, encoded in zip(batch, hashes):
+            user.password = encoded
+
+        try:
+            with transaction.atomic():
+                User.objects.bulk_create(batch)
+        except IntegrityError:
+            # имя заняли между проверкой и вставкой: проверяем ещё раз
+            batch = self.drop_taken(batch)
+            try:
+                with transaction.atomic():
+                    User.objects.bulk_create(batch)
+            except IntegrityError:
+                for user in batch:
+                    self.errors.append({
+                        'line': user._import_line,
+                        'username': user.username,
+                        'error': 'Пачка не создана: имена заняты '
+                                 'параллельной регистрацией',
+                    })
+                return
+        self.created += len(batch)
+
+    def drop_taken(self, batch: List[User]) -> List[User]:
+        """Один запрос занятых имён пачки; занятые уходят в skipped."""
+        names = [user.username for user in batch]
+        taken = set(User.objects.filter(username__in=names).values_list(
+            'username', flat=True
+        ))
+        self.skipped.extend(sorted(taken))
+        return [user for user in batch if user.username not in taken]
@@ -0,0 +1,47 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth.hashers import PBKDF2PasswordHasher
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def hashing_pool() -> ThreadPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ThreadPoolExecutor(
+                max_workers=settings.AUTH_HASHING_WORKERS,
+                thread_name_prefix='password-hash',
+            )
+        return _pool
+
+
+def _forget_pool() -> None:
+    # потоки пула не переживают fork: дочерний процесс заводит свой пул
+    global _pool, _pool_lock
+    _pool = None
+    _pool_lock = threading.Lock()
+
+
+os.register_at_fork(after_in_child=_forget_pool)
+
+
+class PooledPBKDF2PasswordHasher(PBKDF2PasswordHasher):
+    """PBKDF2 в отдельном пуле из AUTH_HASHING_WORKERS потоков.
+
+    Алгоритм и формат хеша прежние, поэтому старые пароли проверяются
+    как раньше. Во время волны входов хеширование занимает не больше
+    AUTH_HASHING_WORKERS ядер, остальные потоки обслуживают ленты.
+    """
+
+    def encode(self, password, salt, iterations=None):
+        if not getattr(settings, 'AUTH_HASHING_WORKERS', 0):
+            return super().encode(password, salt, iterations)
+        encode = super().encode
+        return hashing_pool().submit(
+            encode, password, salt, iterations
+        ).result()
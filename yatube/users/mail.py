@@ -0,0 +1,172 @@
+import logging
+import pickle
+import threading
+import uuid
+from datetime import timedelta
+from typing import List
+
+from django.conf import settings
+from django.core.mail import get_connection
+from django.core.mail.backends.base import BaseEmailBackend
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+
+from .models import QueuedEmail
+
+logger = logging.getLogger('yatube.mail')
+
+DEFAULT_DELIVERY_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
+# сколько секунд письмо закреплено за воркером, пока тот его отправляет
+CLAIM_SECONDS: int = 300
+
+
+def queue_setting(name: str, default):
+    return getattr(settings, f'EMAIL_QUEUE_{name}', default)
+
+
+class QueuedEmailBackend(BaseEmailBackend):
+    """Складывает письма в таблицу очереди вместо отправки.
+
+    Запрос тратит на письмо одну вставку; отправляет воркер
+    (send_queued_mail или поток в процессе) через
+    EMAIL_QUEUE_DELIVERY_BACKEND.
+    """
+
+    def send_messages(self, email_messages) -> int:
+        rows = []
+        for message in email_messages:
+            # соединение не сериализуется и воркеру не нужно
+            message.connection = None
+            rows.append(QueuedEmail(
+                payload=pickle.dumps(message, pickle.HIGHEST_PROTOCOL)
+            ))
+        QueuedEmail.objects.bulk_create(rows)
+        if rows and queue_setting('IN_PROCESS_WORKER', False):
+            # воркер читает через своё соединение и до коммита
+            # строк не увидит
+            transaction.on_commit(worker.wake)
+        return len(rows)
+
+
+def retry_delay(attempts: int) -> timedelta:
+    """Экспоненциальная пауза: 30 с, 1 мин, 2 мин... не больше часа."""
+    base = queue_setting('RETRY_SECONDS', 30)
+    return timedelta(seconds=min(base * 2 ** (attempts - 1), 3600))
+
+
+def claim_batch(batch_size: int) -> List[QueuedEmail]:
+    """Закрепляет за собой пачку писем, срок которых наступил.
+
+    Закрепление — один UPDATE по ключу захвата, поэтому несколько
+    воркеров не отправят одно письмо дважды.
+    """
+    now = timezone.now()
+    due = QueuedEmail.objects.filter(
+        sent_at__isnull=True,
+        next_attempt_at__lte=now,
+        attempts__lt=queue_setting('MAX_ATTEMPTS', 5),
+    )
+    ids = list(due.order_by('next_attempt_at').values_list(
+        'pk', flat=True
+    )[:batch_size])
+    if not ids:
+        return []
+    claim = uuid.uuid4().hex
+    due.filter(pk__in=ids).update(
+        claim=claim,
+        next_attempt_at=now + timedelta(seconds=CLAIM_SECONDS),
+    )
+    return list(QueuedEmail.objects.filter(claim=claim))
+
+
+def deliver_batch(batch_size: int = None) -> int:
+    """Отправляет одну пачку через одно соединение, возвращает их число.
+
+    Неудачное письмо откладывается на retry_delay и после
+    EMAIL_QUEUE_MAX_ATTEMPTS попыток остаётся в таблице с ошибкой.
+    """
+    batch = claim_batch(batch_size or queue_setting('BATCH_SIZE', 50))
+    if not batch:
+        return 0
+    connection = get_connection(
+        queue_setting('DELIVERY_BACKEND', DEFAULT_DELIVERY_BACKEND)
+    )
+    sent_ids = []
+    try:
+        connection.open()
+    except Exception as error:
+        for queued in batch:
+            postpone(queued, error)
+        return len(batch)
+    try:
+        for queued in batch:
+            try:
+                connection.send_messages([pickle.loads(queued.payload)])
+            except Exception as error:
+                postpone(queued, error)
+            else:
+                sent_ids.append(queued.pk)
+    finally:
+        connection.close()
+    QueuedEmail.objects.filter(pk__in=sent_ids).update(
+        sent_at=timezone.now(), claim=''
+    )
+    return len(batch)
+
+
+def postpone(queued: QueuedEmail, error: Exception) -> None:
+    attempts = queued.attempts + 1
+    logger.warning('Письмо %s не отправлено (попытка %s): %s',
+                   queued.pk, attempts, error)
+    QueuedEmail.objects.filter(pk=queued.pk).update(
+        attempts=attempts,
+        next_attempt_at=timezone.now() + retry_delay(attempts),
+        last_error=str(error),
+        claim='',
+    )
+
+
+def deliver_due() -> int:
+    """Отправляет пачки, пока есть письма с наступившим сроком."""
+    total = 0
+    while True:
+        delivered = deliver_batch()
+        if not delivered:
+            return total
+        total += delivered
+
+
+class InProcessWorker:
+    """Фоновый поток процесса, который разбирает очередь.
+
+    Просыпается сразу после постановки письма и раз в
+    EMAIL_QUEUE_POLL_SECONDS, чтобы подобрать повторные попытки.
+    """
+
+    def __init__(self):
+        self._event = threading.Event()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def wake(self) -> None:
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._run, daemon=True, name='email-queue'
+                )
+                self._thread.start()
+        self._event.set()
+
+    def _run(self) -> None:
+        while True:
+            self._event.wait(queue_setting('POLL_SECONDS', 30))
+            self._event.clear()
+            try:
+                deliver_due()
+            except Exception:
+                logger.exception('Ошибка воркера очереди писем')
+            finally:
+                close_old_connections()
+
+
+worker = InProcessWorker()
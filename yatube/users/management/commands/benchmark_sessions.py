@@ -0,0 +1,74 @@
+import statistics
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import reverse
+
+from core.cache import isolated_caches
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = ('Сравнивает пропускную способность авторизованной главной '
+            'страницы при разных SESSION_MODE.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=200)
+        parser.add_argument('--modes', nargs='+',
+                            default=list(settings.SESSION_ENGINES))
+
+    def handle(self, *args, **options):
+        author = User.objects.filter(posts__isnull=False).first()
+        if author is None:
+            raise CommandError('Нет авторов с постами: запустите seed_posts')
+        unknown = set(options['modes']) - set(settings.SESSION_ENGINES)
+        if unknown:
+            raise CommandError('Неизвестные режимы: ' + ', '.join(unknown))
+
+        allowed_hosts = [*settings.ALLOWED_HOSTS, 'testserver']
+        for mode in options['modes']:
+            with override_settings(
+                ALLOWED_HOSTS=allowed_hosts,
+                CACHES=isolated_caches(),
+                SESSION_ENGINE=settings.SESSION_ENGINES[mode],
+            ):
+                result = self.measure(author, options['requests'])
+            self.stdout.write(
+                f'{mode:<16} {result["rps"]:8.1f} запр/с  '
+                f'p50 {result["p50_ms"]:7.2f} мс  '
+                f'запросов к базе {result["queries"]}'
+            )
+
+    @staticmethod
+    def measure(author, requests):
+        # до входа: очистка стёрла бы сессию режима cache; чистится
+        # только отдельный кеш замера
+        cache.clear()
+        client = Client()
+        client.force_login(author)
+        url = reverse('posts:index')
+        client.get(url)
+        timings = []
+        queries = 0
+        for _ in range(requests):
+            with CaptureQueriesContext(connection) as captured:
+                started = time.perf_counter()
+                response = client.get(url)
+                timings.append(time.perf_counter() - started)
+            if response.status_code != 200:
+                raise CommandError(f'{url} ответил {response.status_code}')
+            if not response.wsgi_request.user.is_authenticated:
+                raise CommandError('Сессия потерялась: запрос анонимный')
+            queries = max(queries, len(captured))
+        return {
+            'rps': len(timings) / sum(timings),
+            'p50_ms': statistics.median(timings) * 1000,
+            'queries': queries,
+        }
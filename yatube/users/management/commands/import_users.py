@@ -0,0 +1,38 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from users.bulk_signup import BulkSignup
+
+
+class Command(BaseCommand):
+    help = ('Создаёт аккаунты пачками из CSV с колонками username, email, '
+            'first_name, last_name, password.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='CSV-файл, «-» — stdin')
+        parser.add_argument('--batch-size', type=int, default=None,
+                            help='строк на пачку (SIGNUP_BATCH_SIZE)')
+        parser.add_argument('--processes', type=int, default=None,
+                            help='процессов для хеширования паролей '
+                                 '(SIGNUP_HASHING_PROCESSES), 0 — без пула')
+
+    def handle(self, *args, **options):
+        signup = BulkSignup(options['batch_size'], options['processes'])
+        if options['path'] == '-':
+            report = signup.run(sys.stdin)
+        else:
+            try:
+                with open(options['path'], newline='',
+                          encoding='utf-8-sig') as f:
+                    report = signup.run(f)
+            except OSError as error:
+                raise CommandError(error)
+
+        for error in report['errors']:
+            self.stderr.write(f'Строка {error["line"]}: {error["error"]}')
+        self.stdout.write(
+            f'Создано: {report["created"]}, '
+            f'пропущено занятых имён: {len(report["skipped"])}, '
+            f'ошибок: {len(report["errors"])}'
+        )
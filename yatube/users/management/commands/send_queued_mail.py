@@ -0,0 +1,26 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from users.mail import deliver_due, queue_setting
+
+
+class Command(BaseCommand):
+    help = ('Отправляет письма из очереди QueuedEmailBackend пачками '
+            'с повторными попытками; без --once работает постоянно.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true',
+                            help='разобрать очередь один раз и выйти')
+
+    def handle(self, *args, **options):
+        poll_seconds = queue_setting('POLL_SECONDS', 30)
+        while True:
+            delivered = deliver_due()
+            if delivered:
+                self.stdout.write(f'Обработано писем: {delivered}')
+            if options['once']:
+                return
+            close_old_connections()
+            time.sleep(poll_seconds)
@@ -1,3 +1,31 @@
+from django.db import models
+from django.utils import timezone
 
 
-# Create your models here.
+class QueuedEmail(models.Model):
+    """Письмо в очереди: EmailMessage в pickle и состояние доставки."""
+
+    payload = models.BinaryField('Письмо')
+    created = models.DateTimeField('Создано', auto_now_add=True)
+    next_attempt_at = models.DateTimeField(
+        'Следующая попытка',
+        default=timezone.now
+    )
+    attempts = models.PositiveSmallIntegerField('Попыток', default=0)
+    claim = models.CharField('Захвачено воркером', max_length=32, blank=True)
+    sent_at = models.DateTimeField('Отправлено', null=True, blank=True)
+    last_error = models.TextField('Последняя ошибка', blank=True)
+
+    def __str__(self):
+        return f'Письмо {self.pk}: попыток {self.attempts}'
+
+    class Meta:
+        verbose_name = 'Письмо в очереди'
+        verbose_name_plural = 'Очередь писем'
+        indexes = (
+            # выборка воркера: неотправленные, чья попытка уже наступила
+            models.Index(
+                fields=('sent_at', 'next_attempt_at'),
+                name='queued_email_due_idx',
+            ),
+        )
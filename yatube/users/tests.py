@@ -1,3 +1,333 @@
+import os
+import tempfile
+import threading
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
 
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import (check_password, identify_hasher,
+                                         make_password)
+from django.contrib.sessions.models import Session
+from django.core import mail
+from django.core.cache import caches
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.mail import get_connection, send_mail
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.test import (Client, SimpleTestCase, TestCase,
+                         TransactionTestCase, override_settings)
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.crypto import pbkdf2
 
-# Create your tests here.
+from posts.models import Post
+from .bulk_signup import BulkSignup
+from .hashers import PooledPBKDF2PasswordHasher
+from .mail import deliver_due
+from .models import QueuedEmail
+
+User = get_user_model()
+
+
+class PooledHasherTests(SimpleTestCase):
+    def test_hash_is_computed_in_pool_and_stays_compatible(self):
+        threads = []
+
+        def record(*args, **kwargs):
+            threads.append(threading.current_thread().name)
+            return pbkdf2(*args, **kwargs)
+
+        with mock.patch('django.contrib.auth.hashers.pbkdf2',
+                        side_effect=record):
+            encoded = make_password('s3cret-pass')
+        self.assertTrue(encoded.startswith('pbkdf2_sha256$'))
+        self.assertTrue(threads[0].startswith('password-hash'))
+        self.assertTrue(check_password('s3cret-pass', encoded))
+
+    def test_login_check_runs_in_pool(self):
+        encoded = make_password('s3cret-pass')
+        self.assertIsInstance(identify_hasher(encoded),
+                              PooledPBKDF2PasswordHasher)
+        threads = []
+
+        def record(*args, **kwargs):
+            threads.append(threading.current_thread().name)
+            return pbkdf2(*args, **kwargs)
+
+        with mock.patch('django.contrib.auth.hashers.pbkdf2',
+                        side_effect=record):
+            self.assertTrue(check_password('s3cret-pass', encoded))
+        self.assertEqual(len(threads), 1)
+        self.assertTrue(threads[0].startswith('password-hash'))
+
+    @override_settings(AUTH_HASHING_WORKERS=0)
+    def test_pool_can_be_disabled(self):
+        self.assertTrue(check_password('s3cret-pass',
+                                       make_password('s3cret-pass')))
+
+
+@override_settings(LOGIN_RATE_LIMITS={'ip': (3, 60),
+                                      'ip_username': (2, 60)})
+class LoginRateLimitTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='Nameless',
+                                            password='s3cret-pass')
+
+    def setUp(self):
+        caches['shared'].clear()
+        self.guest_client = Client()
+        self.url = reverse('users:login')
+
+    def login(self, username, password, ip='10.0.0.1'):
+        return self.guest_client.post(
+            self.url, {'username': username, 'password': password},
+            REMOTE_ADDR=ip,
+        )
+
+    def test_blocked_attempt_skips_password_check(self):
+        for _ in range(2):
+            self.assertEqual(self.login('Nameless', 'wrong').status_code, 200)
+        with mock.patch('users.views.LoginView.post') as post:
+            response = self.login('nameless', 's3cret-pass')
+        post.assert_not_called()
+        self.assertEqual(response.status_code, 429)
+        self.assertContains(response, 'Слишком много попыток', status_code=429)
+
+    def test_other_ip_cannot_lock_out_account(self):
+        for _ in range(2):
+            self.login('Nameless', 'wrong', ip='10.0.0.9')
+        self.assertEqual(self.login('Nameless', 's3cret-pass').status_code,
+                         302)
+
+    def test_ip_limit_covers_different_usernames(self):
+        for name in ('a', 'b', 'c'):
+            self.login(name, 'wrong')
+        self.assertEqual(self.login('Nameless', 's3cret-pass').status_code,
+                         429)
+        self.assertEqual(
+            self.login('Nameless', 's3cret-pass', ip='10.0.0.2').status_code,
+            302)
+
+    def test_success_resets_username_counter(self):
+        self.login('Nameless', 'wrong')
+        self.assertEqual(self.login('Nameless', 's3cret-pass').status_code,
+                         302)
+        self.guest_client.logout()
+        self.login('Nameless', 'wrong')
+        self.assertEqual(self.login('Nameless', 's3cret-pass').status_code,
+                         302)
+
+
+class SessionCommandsTests(TestCase):
+    def test_clear_expired_sessions_in_batches(self):
+        now = timezone.now()
+        for i in range(5):
+            Session.objects.create(session_key=f'expired{i}', session_data='',
+                                   expire_date=now - timedelta(days=1))
+        Session.objects.create(session_key='alive', session_data='',
+                               expire_date=now + timedelta(days=1))
+        out = StringIO()
+        with CaptureQueriesContext(connection) as captured:
+            call_command('clear_expired_sessions', batch_size=2, stdout=out)
+        self.assertIn('5', out.getvalue())
+        self.assertEqual(list(Session.objects.values_list('session_key',
+                                                          flat=True)),
+                         ['alive'])
+        deletes = [query for query in captured.captured_queries
+                   if query['sql'].startswith('DELETE')]
+        self.assertEqual(len(deletes), 3)
+
+    @override_settings(
+        SESSION_ENGINE='django.contrib.sessions.backends.signed_cookies')
+    def test_clear_expired_sessions_skips_non_db_engines(self):
+        out = StringIO()
+        call_command('clear_expired_sessions', stdout=out)
+        self.assertIn('истекают сами', out.getvalue())
+
+    def test_benchmark_sessions_covers_all_modes(self):
+        author = User.objects.create_user(username='Nameless')
+        Post.objects.create(text='Тестовый текст', author=author)
+        out = StringIO()
+        caches['shared'].set('keep', 1)
+        call_command('benchmark_sessions', requests=3, stdout=out)
+        for mode in settings.SESSION_ENGINES:
+            self.assertIn(mode, out.getvalue())
+        # замер чистит только свой кеш
+        self.assertEqual(caches['shared'].get('keep'), 1)
+
+
+@override_settings(
+    EMAIL_BACKEND='users.mail.QueuedEmailBackend',
+    EMAIL_QUEUE_DELIVERY_BACKEND='django.core.mail.backends.locmem.'
+                                 'EmailBackend',
+    EMAIL_QUEUE_IN_PROCESS_WORKER=False,
+    EMAIL_QUEUE_MAX_ATTEMPTS=2,
+)
+class QueuedEmailTests(TestCase):
+    def test_password_reset_is_queued_and_delivered_later(self):
+        User.objects.create_user(username='Nameless', email='a@example.com',
+                                 password='s3cret-pass')
+        response = self.client.post(reverse('users:password_reset'),
+                                    {'email': 'a@example.com'})
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(mail.outbox, [])
+        self.assertEqual(QueuedEmail.objects.count(), 1)
+
+        self.assertEqual(deliver_due(), 1)
+        self.assertEqual(mail.outbox[0].to, ['a@example.com'])
+        self.assertIsNotNone(QueuedEmail.objects.get().sent_at)
+        self.assertEqual(deliver_due(), 0)
+
+    def test_failed_message_is_retried_then_given_up(self):
+        send_mail('Тема', 'Текст', 'from@example.com', ['to@example.com'])
+        with mock.patch('django.core.mail.backends.locmem.EmailBackend.'
+                        'send_messages', side_effect=OSError('relay down')):
+            deliver_due()
+            queued = QueuedEmail.objects.get()
+            self.assertEqual(queued.attempts, 1)
+            self.assertEqual(queued.last_error, 'relay down')
+            self.assertGreater(queued.next_attempt_at, timezone.now())
+            # пауза не прошла: письмо не берётся повторно
+            self.assertEqual(deliver_due(), 0)
+
+            QueuedEmail.objects.update(next_attempt_at=timezone.now())
+            deliver_due()
+        QueuedEmail.objects.update(next_attempt_at=timezone.now())
+        self.assertEqual(deliver_due(), 0)
+        self.assertEqual(QueuedEmail.objects.get().attempts, 2)
+        self.assertEqual(mail.outbox, [])
+
+    @override_settings(EMAIL_QUEUE_BATCH_SIZE=2)
+    def test_batches_share_one_connection(self):
+        for i in range(3):
+            send_mail(f'Тема {i}', 'Текст', 'from@example.com',
+                      ['to@example.com'])
+        with mock.patch('users.mail.get_connection',
+                        wraps=get_connection) as connect:
+            self.assertEqual(deliver_due(), 3)
+        self.assertEqual(connect.call_count, 2)
+        self.assertEqual(len(mail.outbox), 3)
+
+
+@override_settings(EMAIL_BACKEND='users.mail.QueuedEmailBackend',
+                   EMAIL_QUEUE_IN_PROCESS_WORKER=True)
+class QueuedEmailWakeTests(TransactionTestCase):
+    def test_worker_is_woken_after_commit(self):
+        with mock.patch('users.mail.worker.wake') as wake:
+            with transaction.atomic():
+                send_mail('Тема', 'Текст', 'from@example.com',
+                          ['to@example.com'])
+                wake.assert_not_called()
+            wake.assert_called_once_with()
+
+
+BULK_CSV = (
+    'username,email,first_name,last_name,password\n'
+    'taken,taken@example.com,,,Gj7-kq!wr8\n'
+    'anna,anna@example.com,Анна,Иванова,Gj7-kq!wr8\n'
+    'boris,,,,\n'
+    'anna,other@example.com,,,Gj7-kq!wr8\n'
+    'bad name!,,,,\n'
+    'vera,vera@example.com,,,12345\n'
+    'gleb,gleb@example.com,,,Zt4_mv#pq2\n'
+    'dina,dina@example.com,,,Zt4_mv#pq2\n'
+)
+
+
+class BulkSignupTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        User.objects.create_user('taken')
+
+    def import_csv(self, *args):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        path = os.path.join(directory.name, 'users.csv')
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(BULK_CSV)
+        out, err = StringIO(), StringIO()
+        with CaptureQueriesContext(connection) as queries:
+            call_command('import_users', path, *args,
+                         stdout=out, stderr=err)
+        return out.getvalue(), err.getvalue(), queries
+
+    def test_command_checks_names_once_per_batch(self):
+        out, err, queries = self.import_csv('--batch-size', '2',
+                                            '--processes', '0')
+        self.assertIn('Создано: 4', out)
+        self.assertIn('Строка 6', err)
+        self.assertIn('Строка 7', err)
+        self.assertEqual(
+            set(User.objects.values_list('username', flat=True)),
+            {'taken', 'anna', 'boris', 'gleb', 'dina'},
+        )
+        anna = User.objects.get(username='anna')
+        self.assertEqual(anna.first_name, 'Анна')
+        self.assertTrue(anna.check_password('Gj7-kq!wr8'))
+        self.assertFalse(User.objects.get(username='boris')
+                         .has_usable_password())
+        sql = [query['sql'] for query in queries.captured_queries]
+        # пять годных строк — три пачки: проверка имён и вставка на каждую
+        self.assertEqual(
+            sum(s.startswith('SELECT') and 'auth_user' in s for s in sql), 3
+        )
+        self.assertEqual(sum(s.startswith('INSERT') for s in sql), 3)
+
+    def test_hashes_are_computed_in_process_pool(self):
+        out, _, _ = self.import_csv('--processes', '2')
+        self.assertIn('Создано: 4', out)
+        self.assertTrue(User.objects.get(username='gleb')
+                        .check_password('Zt4_mv#pq2'))
+
+    def test_api_is_staff_only(self):
+        url = reverse('users:bulk_signup_api')
+        user = User.objects.create_user('member')
+        client = Client()
+        client.force_login(user)
+        response = client.post(url, BULK_CSV, content_type='text/csv')
+        self.assertEqual(response.status_code, 403)
+
+        user.is_staff = True
+        user.save()
+        upload = SimpleUploadedFile('users.csv', BULK_CSV.encode())
+        with self.settings(SIGNUP_HASHING_PROCESSES=4), mock.patch(
+                'users.bulk_signup.ProcessPoolExecutor') as pool:
+            response = client.post(url, {'file': upload})
+        pool.assert_not_called()
+        self.assertEqual(response.status_code, 201)
+        report = response.json()
+        self.assertEqual(report['created'], 4)
+        self.assertEqual(report['skipped'], ['anna', 'taken'])
+        self.assertEqual([error['line'] for error in report['errors']],
+                         [6, 7])
+
+    @override_settings(SIGNUP_API_MAX_ROWS=3)
+    def test_api_caps_rows_per_request(self):
+        client = Client()
+        client.force_login(User.objects.create_user('admin', is_staff=True))
+        response = client.post(reverse('users:bulk_signup_api'), BULK_CSV,
+                               content_type='text/csv')
+        self.assertEqual(response.status_code, 413)
+        self.assertEqual(User.objects.count(), 2)
+
+    def test_race_on_insert_is_reported_not_raised(self):
+        drop_taken = BulkSignup.drop_taken
+        racers = ['anna', 'gleb']
+
+        def racing_drop_taken(signup, batch):
+            batch = drop_taken(signup, batch)
+            # имя регистрируют параллельно между проверкой и вставкой
+            User.objects.create_user(racers.pop(0))
+            return batch
+
+        with mock.patch.object(BulkSignup, 'drop_taken', racing_drop_taken):
+            report = BulkSignup(processes=0).run(StringIO(BULK_CSV))
+        self.assertEqual(report['created'], 0)
+        # «anna» дважды: повтор в файле и занятое при гонке имя
+        self.assertEqual(report['skipped'], ['anna', 'taken', 'anna'])
+        self.assertEqual([error['username'] for error in report['errors']],
+                         ['bad name!', 'vera', 'boris', 'gleb', 'dina'])
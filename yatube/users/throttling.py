@@ -0,0 +1,59 @@
+import hashlib
+from typing import Optional
+
+from django.conf import settings
+from django.core.cache import caches
+
+# (попыток, за сколько секунд); 0 попыток отключает ограничение
+DEFAULT_LOGIN_RATE_LIMITS = {'ip': (20, 300), 'ip_username': (5, 300)}
+
+
+class LoginRateLimiter:
+    """Счётчики неудачных входов по IP и по паре IP + имя.
+
+    Счётчики лежат в общем кеше с окном фиксированной длины;
+    превышение любого из них отклоняет вход до проверки пароля.
+    Имя учитывается только вместе с IP: иначе чужие неудачные
+    попытки блокировали бы вход владельцу аккаунта.
+    """
+
+    def __init__(self):
+        self.limits = getattr(settings, 'LOGIN_RATE_LIMITS',
+                              DEFAULT_LOGIN_RATE_LIMITS)
+        self.cache = caches[getattr(settings, 'LOGIN_RATE_LIMIT_CACHE',
+                                    'default')]
+
+    def keys(self, request, username: Optional[str]) -> dict:
+        ip = request.META.get('REMOTE_ADDR', '')
+        keys = {'ip': 'login_attempts:ip:' + ip}
+        if username:
+            digest = hashlib.md5(
+                f'{ip}:{username.lower()}'.encode()
+            ).hexdigest()
+            keys['ip_username'] = 'login_attempts:user:' + digest
+        return keys
+
+    def blocked(self, request, username: Optional[str]) -> bool:
+        keys = self.keys(request, username)
+        attempts = self.cache.get_many(keys.values())
+        for scope, key in keys.items():
+            limit, _ = self.limits.get(scope, (0, 0))
+            if limit and attempts.get(key, 0) >= limit:
+                return True
+        return False
+
+    def failed(self, request, username: Optional[str]) -> None:
+        for scope, key in self.keys(request, username).items():
+            limit, window = self.limits.get(scope, (0, 0))
+            if not limit:
+                continue
+            self.cache.add(key, 0, window)
+            try:
+                self.cache.incr(key)
+            except ValueError:
+                self.cache.set(key, 1, window)
+
+    def succeeded(self, request, username: Optional[str]) -> None:
+        keys = self.keys(request, username)
+        keys.pop('ip')
+        self.cache.delete_many(keys.values())
@@ -1,4 +1,4 @@
-from django.contrib.auth.views import LogoutView, LoginView, \
+from django.contrib.auth.views import LogoutView, \
     PasswordResetView, PasswordChangeView, \
     PasswordChangeDoneView, PasswordResetDoneView, \
     PasswordResetConfirmView, PasswordResetCompleteView
@@ -17,8 +17,11 @@ urlpatterns = [
     path('signup/',
          views.SignUp.as_view(),
          name='signup'),
+    path('api/bulk-signup/',
+         views.bulk_signup_api,
+         name='bulk_signup_api'),
     path('login/',
-         LoginView.as_view(template_name='users/login.html'),
+         views.ThrottledLoginView.as_view(),
          name='login'),
 
     path('password_change/',
@@ -1,10 +1,91 @@
+import csv
+import io
+
+from django.conf import settings
+from django.contrib.auth.views import LoginView
+from django.http import JsonResponse
 from django.urls import reverse_lazy
+from django.views.decorators.http import require_POST
 from django.views.generic import CreateView
 
+from .bulk_signup import BulkSignup, signup_setting
 from .forms import CreationForm
+from .throttling import LoginRateLimiter
 
 
 class SignUp(CreateView):
     form_class = CreationForm
     success_url = reverse_lazy('posts:index')
     template_name = 'users/signup.html'
+
+
+class ThrottledLoginView(LoginView):
+    """Вход с ограничением неудачных попыток по IP и имени.
+
+    Заблокированная попытка получает 429 раньше, чем считается хеш
+    пароля: волна подбора не занимает процессор хешированием.
+    """
+
+    template_name = 'users/login.html'
+    blocked_message = 'Слишком много попыток входа. Попробуйте позже.'
+
+    def post(self, request, *args, **kwargs):
+        self.limiter = LoginRateLimiter()
+        self.username = request.POST.get('username')
+        if self.limiter.blocked(request, self.username):
+            # несвязанная форма: проверка связанной вызвала бы authenticate
+            form = self.form_class(request,
+                                   initial={'username': self.username})
+            form.cleaned_data = {}
+            form.add_error(None, self.blocked_message)
+            return self.render_to_response(self.get_context_data(form=form),
+                                           status=429)
+        return super().post(request, *args, **kwargs)
+
+    def form_valid(self, form):
+        self.limiter.succeeded(self.request, self.username)
+        return super().form_valid(form)
+
+    def form_invalid(self, form):
+        self.limiter.failed(self.request, self.username)
+        return super().form_invalid(form)
+
+
+@require_POST
+def bulk_signup_api(request):
+    """Массовая регистрация для персонала: CSV файлом «file» или телом.
+
+    Пачка обрабатывается прямо в запросе, поэтому её размер ограничен
+    SIGNUP_API_MAX_ROWS, а хеши считаются без пула процессов: форк из
+    веб-воркера на каждый запрос обходится дороже. Большие списки
+    загружает manage.py import_users.
+    """
+    if not request.user.is_staff:
+        return JsonResponse({'detail': 'Доступ только для персонала'},
+                            status=403)
+    max_rows = signup_setting('API_MAX_ROWS', 100)
+    upload = request.FILES.get('file')
+    # тело запроса Django уже ограничивает, файл — проверяем сами
+    max_bytes = settings.DATA_UPLOAD_MAX_MEMORY_SIZE
+    if upload is not None and max_bytes and upload.size > max_bytes:
+        return too_many_rows(max_rows)
+    data = upload.read() if upload is not None else request.body
+    try:
+        text = data.decode('utf-8-sig')
+    except UnicodeDecodeError:
+        return JsonResponse({'detail': 'CSV должен быть в UTF-8'},
+                            status=400)
+    # строка заголовка плюс не больше max_rows строк данных
+    rows = sum(1 for _ in csv.reader(io.StringIO(text, newline='')))
+    if rows > max_rows + 1:
+        return too_many_rows(max_rows)
+    report = BulkSignup(processes=0).run(io.StringIO(text, newline=''))
+    return JsonResponse(report, status=201 if report['created'] else 200)
+
+
+def too_many_rows(max_rows: int) -> JsonResponse:
+    return JsonResponse(
+        {'detail': f'Не больше {max_rows} строк за запрос, '
+                   'большие списки загружает import_users'},
+        status=413,
+    )
@@ -44,6 +44,9 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'core.middleware.RequestMetricsMiddleware',
+    'core.middleware.PrimaryStickyMiddleware',
+    'core.middleware.ProfilingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -55,12 +58,27 @@ MIDDLEWARE = [
 
 ROOT_URLCONF = 'yatube.urls'
 TEMPLATES_DIR = os.path.join(BASE_DIR, 'templates')
+
+# В боевом режиме шаблоны разбираются один раз на процесс
+# и прогреваются при старте воркера (см. yatube/wsgi.py)
+TEMPLATES_CACHED = not DEBUG
+TEMPLATES_WARM_ON_STARTUP = TEMPLATES_CACHED
+
+TEMPLATE_LOADERS = [
+    'django.template.loaders.filesystem.Loader',
+    'django.template.loaders.app_directories.Loader',
+]
+if TEMPLATES_CACHED:
+    TEMPLATE_LOADERS = [
+        ('django.template.loaders.cached.Loader', TEMPLATE_LOADERS),
+    ]
+
 TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
         'DIRS': [TEMPLATES_DIR],
-        'APP_DIRS': True,
         'OPTIONS': {
+            'loaders': TEMPLATE_LOADERS,
             'context_processors': [
                 'django.template.context_processors.debug',
                 'django.template.context_processors.request',
@@ -86,6 +104,39 @@ DATABASES = {
     }
 }
 
+# PRAGMA для каждого нового соединения с SQLite, см. settings_production
+SQLITE_PRAGMAS = {}
+
+# Реплики только для чтения, например:
+# DATABASES['replica'] = {
+#     'ENGINE': 'django.db.backends.sqlite3',
+#     'NAME': os.path.join(BASE_DIR, 'replica.sqlite3'),
+#     'TEST': {'MIRROR': 'default'},
+# }
+# DATABASE_REPLICAS = ['replica']
+DATABASE_REPLICAS = []
+DATABASE_ROUTERS = ['core.db_router.PrimaryReplicaRouter']
+
+# Сколько секунд после записи клиент читает с основной базы
+PRIMARY_STICKY_SECONDS = 10
+
+# Кеш: LRU в памяти процесса перед общим кешем 'shared'.
+# В settings_production общий уровень файловый, общий для всех воркеров
+CACHES = {
+    'default': {
+        'BACKEND': 'core.cache.TieredCache',
+        'OPTIONS': {
+            'SHARED': 'shared',
+            'LOCAL_MAX_BYTES': 32 * 1024 * 1024,
+            'LOCAL_TIMEOUT': 5,
+        },
+    },
+    'shared': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'yatube-shared',
+    },
+}
+
 # Password validation
 # https://docs.djangoproject.com/en/2.2/ref/settings/#auth-password-validators
 
@@ -104,6 +155,53 @@ AUTH_PASSWORD_VALIDATORS = [
     },
 ]
 
+# Хеширование паролей в пуле из AUTH_HASHING_WORKERS потоков, 0 считает
+# хеш прямо в потоке запроса; формат хешей стандартный pbkdf2_sha256.
+# Обычный PBKDF2PasswordHasher в списке не нужен: у него тот же алгоритм,
+# и check_password выбрал бы его вместо пула
+AUTH_HASHING_WORKERS = 2
+
+PASSWORD_HASHERS = [
+    'users.hashers.PooledPBKDF2PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+    'django.contrib.auth.hashers.Argon2PasswordHasher',
+    'django.contrib.auth.hashers.BCryptSHA256PasswordHasher',
+]
+
+# Массовая регистрация из CSV (import_users, users:bulk_signup_api):
+# команда считает хеши паролей в пуле из SIGNUP_HASHING_PROCESSES
+# процессов, 0 — в текущем процессе
+SIGNUP_HASHING_PROCESSES = 0
+SIGNUP_BATCH_SIZE = 500
+# API считает хеши в запросе без пула, поэтому пачка ограничена
+SIGNUP_API_MAX_ROWS = 100
+
+# Неудачные входы: (попыток, окно в секундах) по IP и по паре IP + имя;
+# счётчик только по имени дал бы любому заблокировать чужой аккаунт.
+# Счётчики в общем кеше, без локального уровня процесса
+LOGIN_RATE_LIMITS = {'ip': (20, 300), 'ip_username': (5, 300)}
+LOGIN_RATE_LIMIT_CACHE = 'shared'
+
+# Хранилище сессий: 'db' читает django_session на каждом запросе
+# авторизованного пользователя, 'cached_db' читает из кеша и пишет
+# в базу только изменения, 'cache' живёт только в кеше,
+# 'signed_cookies' хранит сессию в подписанной cookie без сервера
+SESSION_ENGINES = {
+    'db': 'django.contrib.sessions.backends.db',
+    'cached_db': 'django.contrib.sessions.backends.cached_db',
+    'cache': 'django.contrib.sessions.backends.cache',
+    'signed_cookies': 'django.contrib.sessions.backends.signed_cookies',
+}
+# SESSION_ENGINE вычисляется здесь один раз: профиль, который меняет
+# SESSION_MODE, задаёт заново и SESSION_ENGINE (см. settings_production);
+# расхождение ловит проверка core.W001
+SESSION_MODE = 'db'
+SESSION_ENGINE = SESSION_ENGINES[SESSION_MODE]
+
+# Сессии в кеше (cached_db, cache) читаются из общего кеша: локальный
+# уровень процесса пропустил бы выход из аккаунта в другом воркере
+SESSION_CACHE_ALIAS = 'shared'
+
 # Internationalization
 # https://docs.djangoproject.com/en/2.2/topics/i18n/
 
@@ -125,6 +223,58 @@ STATIC_URL = '/static/'
 LOGIN_URL = 'users:login'
 LOGIN_REDIRECT_URL = 'posts:index'
 
-EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
+# Письма ставятся в очередь (таблица users_queuedemail), отправляет их
+# воркер: поток в процессе или команда send_queued_mail. Отправка
+# идёт через EMAIL_QUEUE_DELIVERY_BACKEND, локально это файлы
+EMAIL_BACKEND = 'users.mail.QueuedEmailBackend'
+EMAIL_QUEUE_DELIVERY_BACKEND = (
+    'django.core.mail.backends.filebased.EmailBackend'
+)
+EMAIL_QUEUE_IN_PROCESS_WORKER = True
+EMAIL_QUEUE_BATCH_SIZE = 50
+EMAIL_QUEUE_MAX_ATTEMPTS = 5
+EMAIL_QUEUE_RETRY_SECONDS = 30
+EMAIL_QUEUE_POLL_SECONDS = 30
 
 EMAIL_FILE_PATH = os.path.join(BASE_DIR, 'sent_emails')
+
+# Сколько секунд хранить страницы лент для неавторизованных посетителей,
+# 0 отключает кеш страниц
+FEED_PAGE_CACHE_TIMEOUT = 60
+
+# Выбор группы в форме поста через автодополнение вместо полного
+# списка: для установок с тысячами групп
+POST_FORM_GROUP_AUTOCOMPLETE = False
+
+# sitemap.xml делится на файлы по SITEMAP_SHARD_SIZE id; Atom-ленты
+# групп и авторов отдают SYNDICATION_ITEMS свежих постов
+SITEMAP_SHARD_SIZE = 50000
+SYNDICATION_ITEMS = 50
+SYNDICATION_MAX_AGE = 3600
+
+# max-age для лент и постов; после него браузер переспрашивает с ETag
+PAGE_MAX_AGE = 0
+
+# Поиск по постам: 'fts5' (SQLite FTS5), 'python' (индекс в памяти)
+# или None, чтобы выбрать FTS5, когда таблица индекса есть в базе
+POSTS_SEARCH_BACKEND = None
+
+# Доля запросов, для которых RequestMetricsMiddleware считает SQL и время
+# рендеринга; REQUEST_METRICS_LOG пишет каждый замер в лог yatube.requests
+REQUEST_METRICS_SAMPLE_RATE = 0.01
+REQUEST_METRICS_LOG = False
+
+# Профилирование выбранных view включается командой profile_views;
+# стеки пишутся в PROFILER_DIR в формате folded для flame graph
+PROFILER_DIR = os.path.join(BASE_DIR, 'profiles')
+PROFILER_INTERVAL = 0.005
+
+# Независимые запросы group_posts и profile (объект и страница ленты)
+# выполняются параллельно в пуле из FEED_QUERY_WORKERS потоков
+FEED_CONCURRENT_QUERIES = False
+FEED_QUERY_WORKERS = 8
+
+# Лента группы из готового списка id свежих постов (обновляется при записи);
+# GROUP_FEED_SIZE — сколько постов группы держать в списке
+GROUP_FEED_STORE = True
+GROUP_FEED_SIZE = 100
@@ -0,0 +1,74 @@
+"""
+Боевой профиль: постоянные соединения с базой, SQLite в режиме WAL,
+кешированные и прогретые шаблоны, сессии через кеш.
+
+Запуск: DJANGO_SETTINGS_MODULE=yatube.settings_production
+DJANGO_ALLOWED_HOSTS=example.com,www.example.com
+"""
+
+import os
+
+from .settings import *  # noqa: F401,F403
+from .settings import (
+    BASE_DIR, CACHES, DATABASES, SESSION_ENGINES, TEMPLATES
+)
+
+DEBUG = False
+
+# Домены через запятую; без переменной сайт не отвечает ни на один Host
+ALLOWED_HOSTS = [
+    host.strip()
+    for host in os.environ.get('DJANGO_ALLOWED_HOSTS', '').split(',')
+    if host.strip()
+]
+
+# Соединение живёт между запросами воркера, а не открывается на каждый
+for database in DATABASES.values():
+    database['CONN_MAX_AGE'] = 600
+    if database['ENGINE'] == 'django.db.backends.sqlite3':
+        # сколько секунд ждать блокировку записи вместо ошибки
+        database.setdefault('OPTIONS', {})['timeout'] = 20
+
+# WAL: читатели не ждут писателя; NORMAL безопасен в режиме WAL
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'mmap_size': 256 * 1024 * 1024,
+    'cache_size': -64 * 1024,
+    'temp_store': 'MEMORY',
+}
+
+# Общий уровень кеша на диске: без внешних сервисов, один на все воркеры
+# сервера, с атомарными add и incr для замков и версий лент
+CACHES['shared'] = {
+    'BACKEND': 'core.cache.FileCache',
+    'LOCATION': os.path.join(BASE_DIR, 'cache'),
+    'OPTIONS': {'MAX_ENTRIES': 100000},
+}
+
+# Несколько серверов делят кеш через memcached: адреса через запятую
+# в MEMCACHED_LOCATION, нужен установленный python-memcached
+if os.environ.get('MEMCACHED_LOCATION'):
+    CACHES['shared'] = {
+        'BACKEND': 'django.core.cache.backends.memcached.MemcachedCache',
+        'LOCATION': os.environ['MEMCACHED_LOCATION'].split(','),
+    }
+
+# Сессия читается из кеша, в базу пишется только при изменении
+SESSION_MODE = 'cached_db'
+SESSION_ENGINE = SESSION_ENGINES[SESSION_MODE]
+
+# Очередь писем разбирает отдельный процесс: manage.py send_queued_mail
+EMAIL_QUEUE_IN_PROCESS_WORKER = False
+
+# import_users считает хеши паролей на всех ядрах
+SIGNUP_HASHING_PROCESSES = os.cpu_count() or 1
+
+TEMPLATES_CACHED = True
+TEMPLATES_WARM_ON_STARTUP = True
+TEMPLATES[0]['OPTIONS']['loaders'] = [
+    ('django.template.loaders.cached.Loader', [
+        'django.template.loaders.filesystem.Loader',
+        'django.template.loaders.app_directories.Loader',
+    ]),
+]
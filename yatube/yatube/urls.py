@@ -2,11 +2,14 @@ from django.contrib import admin
 
 from django.urls import include, path
 
+from core.views import request_metrics
+
 
 urlpatterns = [
     path('', include('posts.urls', namespace='posts')),
     path('auth/', include('users.urls', namespace='users')),
     path('about/', include('about.urls', namespace='about')),
     path('admin/', admin.site.urls),
+    path('metrics/', request_metrics, name='request_metrics'),
     path('auth/', include('django.contrib.auth.urls')),
 ]